@@ -31,19 +31,70 @@ de funcionários usando uniformes da empresa em diferentes condições de ilumin
 """
 
 import os
+import argparse
+
+
+def _physical_cores():
+    """
+    Retorna o número de núcleos físicos (psutil é opcional)
+    """
+    try:
+        import psutil
+        return psutil.cpu_count(logical=False) or os.cpu_count() or 1
+    except ImportError:
+        return os.cpu_count() or 1
+
+
+# Threads de inferência: um por núcleo físico. Definido antes de importar o
+# OpenCV/TensorFlow, que dimensionam seus pools na inicialização; sem isso os
+# dois runtimes disputam os mesmos núcleos (oversubscription).
+NUM_THREADS = _physical_cores()
+os.environ.setdefault("OMP_NUM_THREADS", str(NUM_THREADS))
+os.environ.setdefault("TF_NUM_INTRAOP_THREADS", str(NUM_THREADS))
+os.environ.setdefault("TF_NUM_INTEROP_THREADS", "1")
+
 import cv2
 import numpy as np
 from datetime import datetime
-from tensorflow import keras
 import logging
+import functools
 import json
+import time
+import queue
+import atexit
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson  # Opcional: serialização JSON em C
+except ImportError:
+    orjson = None
+
+# O paralelismo do pré-processamento vem do pool de prefetch (uma imagem por
+# thread); as threads internas do OpenCV só competiriam com ele e com o modelo
+cv2.setNumThreads(1)
 
 # ==============================================================================
 # CONFIGURAÇÕES
 # ==============================================================================
 
 # Caminhos do modelo Teachable Machine
-MODEL_PATH = "models/uniforme_model.h5"
+KERAS_MODEL_PATH = "models/uniforme_model.h5"
+
+# Modelos gerados por converter_modelo.py (usados quando existirem, nesta ordem)
+ONNX_MODEL_PATH = "models/uniforme_model.onnx"
+TFLITE_MODEL_PATH = "models/uniforme_model_int8.tflite"
+
+MODEL_PATH = next(
+    (path for path in (ONNX_MODEL_PATH, TFLITE_MODEL_PATH) if os.path.exists(path)),
+    KERAS_MODEL_PATH
+)
+
+# Delegate XNNPACK externo (tflite-runtime/builds customizados). Se não for
+# encontrado, o resolver BUILTIN do TFLite aplica o XNNPACK embutido.
+XNNPACK_DELEGATE_LIB = "libtensorflowlite_xnnpack_delegate.so"
 LABELS_PATH = "models/uniforme_labels.txt"
 
 # Diretório para logs
@@ -51,8 +102,39 @@ LOGS_DIR = "logs/controle_qualidade"
 
 # Configurações do modelo
 IMG_SIZE = 224
+PIXEL_SCALE = np.float32(1.0 / 255.0)  # Normalização dos pixels para [0, 1]
 CONFIDENCE_THRESHOLD = 0.75  # Mais rigoroso devido à criticidade
 
+# Extensões de imagem aceitas em process_directory
+VALID_EXTENSIONS = frozenset({'.jpg', '.jpeg', '.png', '.bmp'})
+
+# JPEGs grandes são decodificados já reduzidos (escala no domínio DCT do
+# libjpeg): o modelo só usa 224x224 e a evidência é limitada a 640 px
+REDUCED_DECODE_4_BYTES = 1_500_000  # 1/4 da resolução (fotos 4K/12MP)
+REDUCED_DECODE_2_BYTES = 600_000    # 1/2 da resolução (Full HD em alta qualidade)
+
+# Imagens por lote de inferência em process_directory
+BATCH_SIZE = 32
+
+# Lotes pré-carregados em paralelo enquanto o lote atual está na inferência
+PREFETCH_BATCHES = 2
+
+# Slots do anel de lotes: os pré-carregados + o em inferência + o em preenchimento
+RING_SLOTS = PREFETCH_BATCHES + 2
+
+# Máximo de predições mantidas no cache do pipeline em lote (LRU)
+PRED_CACHE_SIZE = 1024
+
+# Buffer do arquivo de violações (descarregado ao fim de cada entrada/lote)
+VIOLATION_LOG_BUFFER = 1 << 16
+
+# Imagens de violação: maior dimensão e qualidade JPEG (suficiente como evidência)
+VIOLATION_IMAGE_MAX_DIM = 640
+VIOLATION_JPEG_QUALITY = 80
+
+# Socket do serviço persistente (servico_uniforme.py)
+SERVICE_SOCKET_PATH = "/tmp/guardian_uniforme.sock"
+
 # ==============================================================================
 # CONFIGURAÇÃO DE LOGGING
 # ==============================================================================
@@ -64,6 +146,32 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+# ==============================================================================
+# COMPATIBILIDADE KERAS
+# ==============================================================================
+
+@functools.lru_cache(maxsize=None)
+def _depthwise_conv2d_fixed():
+    """
+    DepthwiseConv2D que ignora o parâmetro 'groups' (TensorFlow 2.20+)
+
+    Criada sob demanda e uma única vez: o TensorFlow só é importado quando
+    um modelo Keras é carregado.
+
+    Returns:
+        Subclasse de keras.layers.DepthwiseConv2D
+    """
+    from tensorflow import keras
+
+    class DepthwiseConv2DFixed(keras.layers.DepthwiseConv2D):
+        def __init__(self, *args, **kwargs):
+            # Remove o parâmetro 'groups' se existir
+            kwargs.pop('groups', None)
+            super().__init__(*args, **kwargs)
+
+    return DepthwiseConv2DFixed
+
+
 # ==============================================================================
 # CLASSE CONTROLE DE UNIFORMES
 # ==============================================================================
@@ -84,17 +192,38 @@ class ControleUniforme:
         Inicializa o sistema de controle de uniformes
 
         Args:
-            model_path: Caminho para o modelo keras treinado
+            model_path: Caminho para o modelo treinado (.h5, .tflite ou .onnx)
             labels_path: Caminho para arquivo de rótulos
         """
         self.model = None
+        self.interpreter = None
+        self.session = None
+        self.backend = None  # 'keras', 'tflite' ou 'onnx'
         self.labels = []
         self.model_path = model_path
         self.labels_path = labels_path
 
+        # Buffer de entrada reutilizado por verify_uniform
+        self._input_buf = np.empty((1, IMG_SIZE, IMG_SIZE, 3), dtype=np.float32)
+
+        # Anel de lotes pré-alocados do pipeline de prefetch (criado sob demanda)
+        self._ring = None
+
+        # Cache de predições: digest da entrada do modelo -> resultado
+        self._pred_cache = OrderedDict()
+
         # Criar diretório de logs
         os.makedirs(LOGS_DIR, exist_ok=True)
 
+        # Arquivo de violações aberto uma única vez, e gravação das imagens
+        # em segundo plano (uma thread preserva a ordem das gravações)
+        self._violation_log = open(
+            os.path.join(LOGS_DIR, "violacoes_uniforme.log"), 'a',
+            encoding='utf-8', buffering=VIOLATION_LOG_BUFFER
+        )
+        self._io_pool = ThreadPoolExecutor(max_workers=1)
+        atexit.register(self.close)
+
         # Carregar modelo
         self._load_model()
         self._load_labels()
@@ -117,6 +246,10 @@ class ControleUniforme:
         - Incluir variações de iluminação, ângulos e distâncias
         - Considerar diferentes tipos físicos de funcionários
         - Incluir imagens com e sem protetor de barba
+
+        Se o caminho apontar para um .onnx ou .tflite (gerados por
+        converter_modelo.py), a inferência usa o ONNX Runtime ou o TFLite
+        Interpreter em vez do runtime Keras.
         """
         try:
             if not os.path.exists(self.model_path):
@@ -125,35 +258,151 @@ class ControleUniforme:
                 logger.warning("Classes: uniforme_correto, uniforme_incorreto")
                 return
 
-            # Fix para compatibilidade com TensorFlow 2.20+
-            # Remove o parâmetro 'groups' do DepthwiseConv2D
-            import tensorflow as tf
+            if self.model_path.endswith('.onnx'):
+                self._load_onnx_model()
+            elif self.model_path.endswith('.tflite'):
+                self._load_tflite_model()
+            else:
+                self._load_keras_model()
+
+            self._warmup_model()
+
+        except Exception as e:
+            logger.error(f"Erro ao carregar modelo: {e}")
+            raise
 
-            # Carrega o modelo com custom object
-            with tf.keras.utils.custom_object_scope({}):
-                # Cria uma classe wrapper para DepthwiseConv2D que ignora 'groups'
-                original_depthwise = tf.keras.layers.DepthwiseConv2D
+    def _load_keras_model(self):
+        """
+        Carrega o modelo .h5 no runtime Keras (fallback sem conversão)
+        """
+        # Import tardio: só o backend Keras paga a inicialização do TensorFlow
+        from tensorflow import keras
 
-                class DepthwiseConv2DFixed(original_depthwise):
-                    def __init__(self, *args, **kwargs):
-                        # Remove o parâmetro 'groups' se existir
-                        kwargs.pop('groups', None)
-                        super().__init__(*args, **kwargs)
+        # Fix para compatibilidade com TensorFlow 2.20+: a camada corrigida é
+        # passada via custom_objects, sem trocar a classe global do Keras
+        self.model = keras.models.load_model(
+            self.model_path,
+            compile=False,
+            custom_objects={'DepthwiseConv2D': _depthwise_conv2d_fixed()}
+        )
 
-                # Substitui temporariamente
-                tf.keras.layers.DepthwiseConv2D = DepthwiseConv2DFixed
+        self.backend = 'keras'
+        logger.info(f"Modelo de uniformes carregado: {self.model_path}")
 
-                try:
-                    self.model = keras.models.load_model(self.model_path, compile=False)
-                finally:
-                    # Restaura a classe original
-                    tf.keras.layers.DepthwiseConv2D = original_depthwise
+    def _warmup_model(self):
+        """
+        Executa uma inferência com entrada nula logo após o carregamento
 
-            logger.info(f"Modelo de uniformes carregado: {self.model_path}")
+        A primeira chamada monta o grafo/aloca os kernels; assim esse custo
+        não cai sobre a primeira entrada real em verify_uniform.
+        """
+        try:
+            start = time.perf_counter()
+            self._run_inference(np.zeros((1, IMG_SIZE, IMG_SIZE, 3), dtype=np.float32))
+            logger.info(f"Aquecimento do modelo: {(time.perf_counter() - start) * 1000:.0f} ms")
 
         except Exception as e:
-            logger.error(f"Erro ao carregar modelo: {e}")
-            raise
+            logger.warning(f"Falha no aquecimento do modelo: {e}")
+
+    def _load_tflite_model(self):
+        """
+        Carrega o modelo TFLite (INT8) e aloca os tensores uma única vez
+
+        Os kernels de Conv/DepthwiseConv rodam via XNNPACK (AVX2/NEON).
+        """
+        import tensorflow as tf
+
+        resolver = tf.lite.experimental.OpResolverType
+        try:
+            delegates = [tf.lite.experimental.load_delegate(XNNPACK_DELEGATE_LIB)]
+            # Evita aplicar o XNNPACK embutido por cima do delegate externo
+            op_resolver = resolver.BUILTIN_WITHOUT_DEFAULT_DELEGATES
+            logger.info(f"Delegate XNNPACK carregado: {XNNPACK_DELEGATE_LIB}")
+        except (ValueError, OSError):
+            delegates = None
+            op_resolver = resolver.BUILTIN
+            logger.info("Usando XNNPACK embutido do TFLite")
+
+        self.interpreter = tf.lite.Interpreter(
+            model_path=self.model_path,
+            num_threads=NUM_THREADS,
+            experimental_delegates=delegates,
+            experimental_op_resolver_type=op_resolver,
+            experimental_preserve_all_tensors=False
+        )
+        self.interpreter.allocate_tensors()
+
+        self._input_details = self.interpreter.get_input_details()[0]
+        self._output_details = self.interpreter.get_output_details()[0]
+        self.backend = 'tflite'
+
+        logger.info(f"Modelo TFLite de uniformes carregado: {self.model_path} "
+                    f"(entrada {self._input_details['dtype'].__name__})")
+
+    def _load_onnx_model(self):
+        """
+        Carrega o modelo ONNX no ONNX Runtime (CPU execution provider)
+
+        O otimizador de grafo do ORT funde Conv+BN+ativação e usa kernels
+        MLAS/oneDNN, mais leves que o runtime TensorFlow completo.
+        """
+        import onnxruntime as ort
+
+        sess_options = ort.SessionOptions()
+        sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        sess_options.intra_op_num_threads = NUM_THREADS
+
+        self.session = ort.InferenceSession(
+            self.model_path,
+            sess_options=sess_options,
+            providers=['CPUExecutionProvider']
+        )
+        self._onnx_input_name = self.session.get_inputs()[0].name
+        self.backend = 'onnx'
+
+        logger.info(f"Modelo ONNX de uniformes carregado: {self.model_path}")
+
+    def _run_inference(self, batch):
+        """
+        Executa o modelo carregado sobre um lote pré-processado
+
+        Args:
+            batch: Array float32 (N, IMG_SIZE, IMG_SIZE, 3) normalizado em [0, 1]
+
+        Returns:
+            Array float32 (N, num_classes) com as probabilidades
+        """
+        if self.backend == 'onnx':
+            return self.session.run(None, {self._onnx_input_name: batch})[0]
+
+        if self.backend == 'keras':
+            return self.model.predict(batch, batch_size=BATCH_SIZE, verbose=0)
+
+        if self._input_details['shape'][0] != len(batch):
+            # Redimensionar o tensor de entrada para o tamanho do lote
+            self.interpreter.resize_tensor_input(self._input_details['index'], batch.shape)
+            self.interpreter.allocate_tensors()
+            self._input_details = self.interpreter.get_input_details()[0]
+            self._output_details = self.interpreter.get_output_details()[0]
+
+        input_details = self._input_details
+        if input_details['dtype'] != np.float32:
+            # Quantizar entrada com a escala/zero-point do modelo INT8
+            scale, zero_point = input_details['quantization']
+            info = np.iinfo(input_details['dtype'])
+            batch = np.clip(np.rint(batch / scale + zero_point), info.min, info.max)
+            batch = batch.astype(input_details['dtype'])
+
+        self.interpreter.set_tensor(input_details['index'], batch)
+        self.interpreter.invoke()
+        predictions = self.interpreter.get_tensor(self._output_details['index'])
+
+        if predictions.dtype != np.float32:
+            # Dequantizar a saída para probabilidades
+            scale, zero_point = self._output_details['quantization']
+            predictions = (predictions.astype(np.float32) - zero_point) * scale
+
+        return predictions
 
     def _load_labels(self):
         """
@@ -164,41 +413,77 @@ class ControleUniforme:
                 logger.warning(f"Arquivo de rótulos não encontrado: {self.labels_path}")
                 # Definir rótulos padrão para demonstração
                 self.labels = ['uniforme_correto', 'uniforme_incorreto']
-                return
+            else:
+                with open(self.labels_path, 'r', encoding='utf-8') as f:
+                    self.labels = [line.strip() for line in f.readlines()]
 
-            with open(self.labels_path, 'r', encoding='utf-8') as f:
-                self.labels = [line.strip() for line in f.readlines()]
+                logger.info(f"Rótulos carregados: {self.labels}")
 
-            logger.info(f"Rótulos carregados: {self.labels}")
+            # Tabelas por índice de classe para decidir o lote inteiro de uma vez
+            # (a última posição cobre índices fora da lista de rótulos)
+            self._label_names = np.array(self.labels + ["unknown"], dtype=object)
+            self._compliant_classes = np.array(
+                ['correto' in label.lower() for label in self.labels] + [False]
+            )
 
         except Exception as e:
             logger.error(f"Erro ao carregar rótulos: {e}")
             raise
 
-    def preprocess_image(self, image):
+    def preprocess_image(self, image, out=None):
         """
         Pré-processa imagem para inferência
 
         Args:
             image: Imagem BGR do OpenCV
+            out: Destino float32 (IMG_SIZE, IMG_SIZE, 3) opcional. Sem ele é
+                 usado o buffer interno, reaproveitado a cada chamada (não
+                 thread-safe; as threads de prefetch sempre passam `out`)
 
         Returns:
-            Array normalizado pronto para predição
+            Array normalizado (1, IMG_SIZE, IMG_SIZE, 3) pronto para predição
+        """
+        return self._normalize_image(self._resize_image(image), out)
+
+    @staticmethod
+    def _resize_image(image):
+        """
+        Redimensiona a imagem BGR para a resolução do modelo
+
+        Args:
+            image: Imagem BGR do OpenCV
+
+        Returns:
+            Imagem BGR uint8 (IMG_SIZE, IMG_SIZE, 3)
         """
         try:
-            # Converter BGR para RGB
-            image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+            # Redimensionar antes de normalizar: a troca de canais opera só em 224x224
+            return cv2.resize(image, (IMG_SIZE, IMG_SIZE), interpolation=cv2.INTER_AREA)
 
-            # Redimensionar
-            image_resized = cv2.resize(image_rgb, (IMG_SIZE, IMG_SIZE))
+        except Exception as e:
+            logger.error(f"Erro no pré-processamento: {e}")
+            raise
 
-            # Normalizar [0, 1]
-            image_normalized = image_resized.astype(np.float32) / 255.0
+    def _normalize_image(self, image_resized, out=None):
+        """
+        Converte a imagem já redimensionada no tensor de entrada do modelo
 
-            # Adicionar batch dimension
-            image_batch = np.expand_dims(image_normalized, axis=0)
+        Args:
+            image_resized: Imagem BGR uint8 (IMG_SIZE, IMG_SIZE, 3)
+            out: Destino float32 opcional (ver preprocess_image)
 
-            return image_batch
+        Returns:
+            Array normalizado (1, IMG_SIZE, IMG_SIZE, 3)
+        """
+        try:
+            # Normalizar [0, 1] direto no buffer de destino, lendo os canais
+            # em ordem invertida: BGR -> RGB sai na mesma passada, sem cvtColor
+            if out is None:
+                out = self._input_buf[0]
+            np.multiply(image_resized[..., ::-1], PIXEL_SCALE, out=out, dtype=np.float32)
+
+            # Batch dimension (view, sem cópia)
+            return out[np.newaxis]
 
         except Exception as e:
             logger.error(f"Erro no pré-processamento: {e}")
@@ -215,33 +500,113 @@ class ControleUniforme:
             tuple: (is_compliant, class_name, confidence)
         """
         try:
-            if self.model is None:
+            if self.backend is None:
                 logger.warning("Modelo não carregado - executando em modo demonstração")
                 # Retornar predição simulada
                 return True, "uniforme_correto", 0.95
 
-            # Pré-processar
-            processed = self.preprocess_image(image)
-
-            # Predição
-            predictions = self.model.predict(processed, verbose=0)
-
-            # Obter classe
-            class_index = np.argmax(predictions[0])
-            confidence = predictions[0][class_index]
-            class_name = self.labels[class_index] if class_index < len(self.labels) else "unknown"
-
-            # Verificar conformidade
-            is_compliant = 'correto' in class_name.lower() and confidence >= CONFIDENCE_THRESHOLD
+            # Pré-processar e predizer
+            result = self._predict_prepared(self.preprocess_image(image))[0]
+            is_compliant, class_name, confidence = result
 
             logger.info(f"Verificação: {class_name} (confiança: {confidence:.2%})")
 
-            return is_compliant, class_name, confidence
+            return result
 
         except Exception as e:
             logger.error(f"Erro na verificação: {e}")
             raise
 
+    def _predict_prepared(self, batch):
+        """
+        Executa o modelo sobre um lote já pré-processado
+
+        Args:
+            batch: Array float32 (N, IMG_SIZE, IMG_SIZE, 3) de preprocess_image
+
+        Returns:
+            list: Uma tupla (is_compliant, class_name, confidence) por imagem
+        """
+        if self.backend is None:
+            logger.warning("Modelo não carregado - executando em modo demonstração")
+            # Retornar predições simuladas
+            return [(True, "uniforme_correto", 0.95)] * len(batch)
+
+        return self._decide(self._run_inference(batch))
+
+    def _predict_cached(self, keys, batch):
+        """
+        Executa o modelo só sobre as linhas do lote ausentes no cache
+
+        A chave é o digest exato da entrada do modelo, então um acerto só
+        acontece quando o modelo veria a mesma imagem (capturas repetidas em
+        um manifesto ou ao longo de um turno do serviço). Linhas repetidas
+        dentro do mesmo lote compartilham uma única inferência.
+
+        Args:
+            keys: Digest de cada linha do lote (de _load_and_preprocess)
+            batch: Array float32 (N, IMG_SIZE, IMG_SIZE, 3); as linhas ausentes
+                   são compactadas no início dele
+
+        Returns:
+            list: Uma tupla (is_compliant, class_name, confidence) por imagem
+        """
+        if self.backend is None:
+            return self._predict_prepared(batch)
+
+        cache = self._pred_cache
+        results = [None] * len(keys)
+        misses = {}  # digest -> linhas do lote, na ordem da primeira ocorrência
+
+        for i, key in enumerate(keys):
+            cached = cache.get(key)
+            if cached is not None:
+                cache.move_to_end(key)
+                results[i] = cached
+            else:
+                misses.setdefault(key, []).append(i)
+
+        if misses:
+            # Compacta a primeira linha de cada ausência no início do lote (i >= j)
+            for j, rows in enumerate(misses.values()):
+                if rows[0] != j:
+                    batch[j] = batch[rows[0]]
+
+            predicted = self._predict_prepared(batch[:len(misses)])
+
+            for (key, rows), result in zip(misses.items(), predicted):
+                for i in rows:
+                    results[i] = result
+                cache[key] = result
+                if len(cache) > PRED_CACHE_SIZE:
+                    cache.popitem(last=False)
+
+        logger.debug(f"Cache de predições: {len(keys) - len(misses)}/{len(keys)} acertos")
+
+        return results
+
+    def _decide(self, predictions):
+        """
+        Converte as probabilidades de um lote em decisões (vetorizado)
+
+        Args:
+            predictions: Array (N, num_classes) com as probabilidades
+
+        Returns:
+            list: Uma tupla (is_compliant, class_name, confidence) por imagem
+        """
+        # Obter classe e confiança de todas as linhas em uma passada
+        class_indices = predictions.argmax(axis=1)
+        confidences = np.take_along_axis(predictions, class_indices[:, np.newaxis], axis=1)[:, 0]
+
+        class_indices = np.minimum(class_indices, len(self.labels))
+        names = self._label_names[class_indices]
+
+        # Verificar conformidade
+        compliant = self._compliant_classes[class_indices] & (confidences >= CONFIDENCE_THRESHOLD)
+
+        return list(zip(compliant.tolist(), names.tolist(), confidences.tolist()))
+
     def log_violation(self, image, class_name, confidence):
         """
         Registra violação de conformidade de uniforme
@@ -254,22 +619,21 @@ class ControleUniforme:
         try:
             timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
 
-            # Salvar imagem
-            image_filename = f"violacao_uniforme_{timestamp}.jpg"
+            self.violations_count += 1
+
+            # Salvar imagem em segundo plano (numerada: lotes geram várias
+            # violações no mesmo segundo)
+            image_filename = f"violacao_uniforme_{timestamp}_{self.violations_count:04d}.jpg"
             image_path = os.path.join(LOGS_DIR, image_filename)
-            cv2.imwrite(image_path, image)
+            self._io_pool.submit(self._write_violation_image, image, image_path)
 
             # Criar log
-            log_file = os.path.join(LOGS_DIR, "violacoes_uniforme.log")
-            with open(log_file, 'a', encoding='utf-8') as f:
-                log_entry = (
-                    f"[{timestamp}] - VIOLAÇÃO: Uniforme não conforme detectado. "
-                    f"Classe: {class_name}, Confiança: {confidence:.2%}, "
-                    f"Imagem: {image_path}\n"
-                )
-                f.write(log_entry)
-
-            self.violations_count += 1
+            log_entry = (
+                f"[{timestamp}] - VIOLAÇÃO: Uniforme não conforme detectado. "
+                f"Classe: {class_name}, Confiança: {confidence:.2%}, "
+                f"Imagem: {image_path}\n"
+            )
+            self._violation_log.write(log_entry)
 
             logger.warning(f"⚠️ VIOLAÇÃO #{self.violations_count} registrada: {class_name}")
 
@@ -277,7 +641,66 @@ class ControleUniforme:
             logger.error(f"Erro ao registrar violação: {e}")
             raise
 
-    def grant_access(self):
+    @staticmethod
+    def _write_violation_image(image, image_path):
+        """
+        Codifica e grava a imagem da violação (executado na thread de I/O)
+
+        Args:
+            image: Imagem BGR da violação
+            image_path: Caminho do arquivo .jpg
+        """
+        try:
+            # Reduzir imagens grandes antes de codificar
+            height, width = image.shape[:2]
+            scale = VIOLATION_IMAGE_MAX_DIM / max(height, width)
+            if scale < 1.0:
+                image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+            ok, buffer = cv2.imencode('.jpg', image, [
+                cv2.IMWRITE_JPEG_QUALITY, VIOLATION_JPEG_QUALITY,
+                cv2.IMWRITE_JPEG_OPTIMIZE, 1
+            ])
+            if not ok:
+                raise ValueError("falha na codificação JPEG")
+            buffer.tofile(image_path)
+
+        except Exception as e:
+            logger.error(f"Erro ao salvar imagem da violação {image_path}: {e}")
+
+    def flush(self):
+        """
+        Descarrega o log de violações em disco
+        """
+        if not self._violation_log.closed:
+            self._violation_log.flush()
+
+    def close(self):
+        """
+        Aguarda as gravações pendentes e fecha o log de violações
+        """
+        self._io_pool.shutdown(wait=True)
+        if not self._violation_log.closed:
+            self._violation_log.close()
+
+    def _apply_decision(self, image, is_compliant, class_name, confidence):
+        """
+        Libera ou bloqueia o acesso e registra a violação
+
+        Usa a imagem BGR já decodificada, sem reler o arquivo.
+
+        Args:
+            image: Imagem BGR do funcionário
+            is_compliant: Resultado da verificação
+            class_name: Classe detectada
+            confidence: Confiança da predição
+        """
+        announce_decision(is_compliant, class_name, confidence)
+        if not is_compliant:
+            self.log_violation(image, class_name, confidence)
+
+    @staticmethod
+    def grant_access():
         """
         Simula liberação de acesso à zona restrita
         """
@@ -288,7 +711,8 @@ class ControleUniforme:
         print("Entrada autorizada na zona de alta higiene")
         print("="*50 + "\n")
 
-    def deny_access(self, reason):
+    @staticmethod
+    def deny_access(reason):
         """
         Simula bloqueio de acesso à zona restrita
 
@@ -314,115 +738,537 @@ class ControleUniforme:
             if not os.path.exists(image_path):
                 raise FileNotFoundError(f"Imagem não encontrada: {image_path}")
 
-            image = cv2.imread(image_path)
+            image = self._read_image(image_path)
             if image is None:
                 raise ValueError(f"Não foi possível carregar: {image_path}")
 
             logger.info(f"Processando entrada: {image_path}")
 
             # Verificar uniforme
-            is_compliant, class_name, confidence = self.verify_uniform(image)
-
-            if is_compliant:
-                self.grant_access()
-            else:
-                reason = f"Uniforme não conforme detectado ({class_name}, {confidence:.1%})"
-                self.deny_access(reason)
-                self.log_violation(image, class_name, confidence)
+            self._apply_decision(image, *self.verify_uniform(image))
+            self.flush()
 
         except Exception as e:
             logger.error(f"Erro ao processar entrada: {e}")
             raise
 
-    def process_directory(self, directory_path):
+    def process_directory(self, directory_path, batch_size=BATCH_SIZE):
         """
         Processa múltiplas tentativas de entrada
 
         Args:
             directory_path: Diretório com imagens
+            batch_size: Número de imagens por inferência
         """
         try:
-            if not os.path.exists(directory_path):
-                raise FileNotFoundError(f"Diretório não encontrado: {directory_path}")
+            image_paths = list_images(directory_path)
+            if not image_paths:
+                logger.warning(f"Nenhuma imagem em: {directory_path}")
+                return
 
-            valid_extensions = ['.jpg', '.jpeg', '.png', '.bmp']
-            image_files = [
-                f for f in os.listdir(directory_path)
-                if os.path.splitext(f)[1].lower() in valid_extensions
-            ]
+            self.process_paths(image_paths, batch_size)
 
-            if not image_files:
-                logger.warning(f"Nenhuma imagem em: {directory_path}")
+        except Exception as e:
+            logger.error(f"Erro ao processar diretório: {e}")
+            raise
+
+    def process_paths(self, image_paths, batch_size=BATCH_SIZE):
+        """
+        Processa uma lista explícita de tentativas de entrada
+
+        Usado diretamente com um manifesto, evitando varrer o diretório a
+        cada execução e mantendo a ordem de processamento reprodutível.
+
+        Args:
+            image_paths: Lista de caminhos de imagem
+            batch_size: Número de imagens por inferência
+        """
+        try:
+            if not image_paths:
+                logger.warning("Nenhuma imagem para processar")
                 return
 
-            logger.info(f"Processando {len(image_files)} tentativas de entrada")
+            logger.info(f"Processando {len(image_paths)} tentativas de entrada")
 
             approved = 0
             denied = 0
 
-            for image_file in image_files:
-                image_path = os.path.join(directory_path, image_file)
-                print(f"\n--- Processando: {image_file} ---")
-
-                image = cv2.imread(image_path)
-                is_compliant, class_name, confidence = self.verify_uniform(image)
+            for image_path, is_compliant, class_name, confidence in self.evaluate_paths(
+                    image_paths, batch_size):
+                print_entry_result(image_path, is_compliant, class_name, confidence)
 
                 if is_compliant:
-                    self.grant_access()
                     approved += 1
                 else:
-                    reason = f"Uniforme não conforme ({class_name})"
-                    self.deny_access(reason)
-                    self.log_violation(image, class_name, confidence)
                     denied += 1
 
-            # Resumo
-            print("\n" + "="*50)
-            print("RESUMO DO PROCESSAMENTO")
-            print("="*50)
-            print(f"Total de tentativas: {len(image_files)}")
-            print(f"Acessos aprovados: {approved}")
-            print(f"Acessos negados: {denied}")
-            print(f"Taxa de conformidade: {approved/len(image_files)*100:.1f}%")
-            print("="*50)
+            print_summary(len(image_paths), approved, denied)
 
         except Exception as e:
-            logger.error(f"Erro ao processar diretório: {e}")
+            logger.error(f"Erro ao processar entradas: {e}")
             raise
 
+    def evaluate_paths(self, image_paths, batch_size=BATCH_SIZE):
+        """
+        Verifica uma lista de imagens e registra as violações, sem saída no console
+
+        Imagens que não puderem ser carregadas são ignoradas. Usado por
+        process_paths e pelo serviço persistente (servico_uniforme.py).
+
+        Args:
+            image_paths: Lista de caminhos de imagem
+            batch_size: Número de imagens por inferência
+
+        Yields:
+            tuple: (caminho, is_compliant, class_name, confidence)
+        """
+        for names, images, keys, batch in self._iter_batches(image_paths, batch_size):
+            # Uma única inferência para as linhas do lote fora do cache
+            results = self._predict_cached(keys, batch)
+
+            for image_path, image, (is_compliant, class_name, confidence) in zip(names, images, results):
+                # Reaproveita a imagem decodificada no prefetch
+                if not is_compliant:
+                    self.log_violation(image, class_name, confidence)
+                yield image_path, is_compliant, class_name, confidence
+
+            self.flush()
+
+    @staticmethod
+    def _read_image(image_path):
+        """
+        Lê a imagem, decodificando JPEGs grandes em resolução reduzida
+
+        Args:
+            image_path: Caminho da imagem
+
+        Returns:
+            Imagem BGR, ou None se não puder ser carregada
+        """
+        # Arquivo ausente ou link quebrado: ignorado como qualquer imagem
+        # ilegível, em vez de abortar o lote
+        try:
+            flag = cv2.IMREAD_COLOR
+            if image_path.lower().endswith(('.jpg', '.jpeg')):
+                size = os.path.getsize(image_path)
+                if size > REDUCED_DECODE_4_BYTES:
+                    flag = cv2.IMREAD_REDUCED_COLOR_4
+                elif size > REDUCED_DECODE_2_BYTES:
+                    flag = cv2.IMREAD_REDUCED_COLOR_2
+
+            return cv2.imread(image_path, flag)
+        except OSError:
+            return None
+
+    def _load_and_preprocess(self, image_path, out):
+        """
+        Lê e pré-processa uma imagem (executado nas threads de prefetch)
+
+        Args:
+            image_path: Caminho da imagem
+            out: Linha do lote (IMG_SIZE, IMG_SIZE, 3) a ser preenchida
+
+        Returns:
+            tuple: (imagem BGR, digest da entrada do modelo), ou None se a
+                   imagem não puder ser carregada
+        """
+        image = self._read_image(image_path)
+        if image is None:
+            return None
+
+        # Chave do cache sobre a imagem redimensionada (uint8), antes da
+        # normalização: o mesmo digest implica a mesma entrada do modelo
+        image_resized = self._resize_image(image)
+        key = hashlib.blake2b(image_resized, digest_size=16).digest()
+        self._normalize_image(image_resized, out=out)
+        return image, key
+
+    def _iter_batches(self, image_paths, batch_size=BATCH_SIZE):
+        """
+        Gera lotes pré-processados em paralelo com a inferência
+
+        Uma thread produtora decodifica e pré-processa os próximos lotes no
+        pool (o OpenCV libera o GIL) enquanto o chamador executa o modelo
+        sobre o lote atual. A ordem das imagens é preservada.
+
+        Os lotes são escritos em um anel fixo de RING_SLOTS arrays
+        pré-alocados: a produtora pega um slot livre, preenche no lugar e o
+        entrega; o slot volta a ficar livre quando o chamador pede o próximo
+        lote. Por isso o array recebido só é válido até a próxima iteração.
+
+        Args:
+            image_paths: Lista de caminhos de imagem
+            batch_size: Número de imagens por lote
+
+        Yields:
+            tuple: (caminhos, imagens BGR, digests das entradas,
+                    lote float32 (N, IMG_SIZE, IMG_SIZE, 3))
+        """
+        if self._ring is None or self._ring[0].shape[0] < batch_size:
+            self._ring = [
+                np.empty((batch_size, IMG_SIZE, IMG_SIZE, 3), dtype=np.float32)
+                for _ in range(RING_SLOTS)
+            ]
+        ring = self._ring
+
+        free_slots = queue.Queue()
+        for slot in range(RING_SLOTS):
+            free_slots.put(slot)
+        ready = queue.Queue()
+        stop = threading.Event()
+
+        def producer():
+            try:
+                with ThreadPoolExecutor(max_workers=NUM_THREADS) as pool:
+                    for start in range(0, len(image_paths), batch_size):
+                        slot = free_slots.get()
+                        if stop.is_set():
+                            return
+
+                        chunk = image_paths[start:start + batch_size]
+                        batch = ring[slot]
+
+                        # Cada thread escreve direto na sua linha do slot
+                        names, images, keys, valid = [], [], [], []
+                        for i, (image_path, loaded) in enumerate(zip(
+                                chunk, pool.map(self._load_and_preprocess, chunk, batch))):
+                            if loaded is None:
+                                logger.warning(f"Não foi possível carregar: {image_path}")
+                                continue
+                            names.append(image_path)
+                            images.append(loaded[0])
+                            keys.append(loaded[1])
+                            valid.append(i)
+
+                        # Compacta as linhas válidas no início do slot (i >= j)
+                        for j, i in enumerate(valid):
+                            if i != j:
+                                batch[j] = batch[i]
+
+                        if images:
+                            ready.put((slot, names, images, keys))
+                        else:
+                            free_slots.put(slot)
+            except Exception as e:
+                ready.put(e)
+            else:
+                ready.put(None)
+
+        thread = threading.Thread(target=producer, daemon=True)
+        thread.start()
+
+        try:
+            while True:
+                item = ready.get()
+                if item is None:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                slot, names, images, keys = item
+                yield names, images, keys, ring[slot][:len(images)]
+                free_slots.put(slot)
+        finally:
+            # Encerrado antes do fim: acorda a produtora e espera ela soltar o anel
+            stop.set()
+            free_slots.put(None)
+            thread.join()
+
     def generate_compliance_report(self):
         """
         Gera relatório de conformidade do dia
         """
-        try:
-            timestamp = datetime.now().strftime("%Y-%m-%d")
-            report_file = os.path.join(LOGS_DIR, f"relatorio_conformidade_{timestamp}.json")
+        generate_compliance_report(self.violations_count)
+
+
+# ==============================================================================
+# SAÍDA NO CONSOLE
+# ==============================================================================
+
+def announce_decision(is_compliant, class_name, confidence):
+    """
+    Exibe a liberação ou o bloqueio do acesso (não depende do modelo)
+
+    Args:
+        is_compliant: Resultado da verificação
+        class_name: Classe detectada
+        confidence: Confiança da predição
+    """
+    if is_compliant:
+        ControleUniforme.grant_access()
+    else:
+        reason = f"Uniforme não conforme detectado ({class_name}, {confidence:.1%})"
+        ControleUniforme.deny_access(reason)
+
+
+def print_entry_result(image_path, is_compliant, class_name, confidence):
+    """
+    Exibe o resultado de uma tentativa de entrada processada em lote
+
+    Args:
+        image_path: Caminho da imagem
+        is_compliant: Resultado da verificação
+        class_name: Classe detectada
+        confidence: Confiança da predição
+    """
+    print(f"\n--- Processando: {os.path.basename(image_path)} ---")
+    logger.info(f"Verificação: {class_name} (confiança: {confidence:.2%})")
+    announce_decision(is_compliant, class_name, confidence)
 
-            report = {
-                "data": timestamp,
-                "total_violacoes": self.violations_count,
-                "sistema": "Controle de Uniformes - Qualidade",
-                "area": "Zona de Alta Higiene - Embalagem",
-                "threshold_confianca": CONFIDENCE_THRESHOLD
-            }
 
+def print_summary(total, approved, denied):
+    """
+    Exibe o resumo do processamento em lote
+
+    Args:
+        total: Total de tentativas (incluindo imagens ilegíveis)
+        approved: Acessos aprovados
+        denied: Acessos negados
+    """
+    print("\n" + "="*50)
+    print("RESUMO DO PROCESSAMENTO")
+    print("="*50)
+    print(f"Total de tentativas: {total}")
+    print(f"Acessos aprovados: {approved}")
+    print(f"Acessos negados: {denied}")
+    print(f"Taxa de conformidade: {approved/total*100:.1f}%")
+    print("="*50)
+
+
+# ==============================================================================
+# RELATÓRIO
+# ==============================================================================
+
+def generate_compliance_report(violations_count=0):
+    """
+    Gera relatório de conformidade do dia
+
+    Não depende do modelo, permitindo gerar o relatório sem carregar o
+    TensorFlow.
+
+    Args:
+        violations_count: Total de violações registradas
+    """
+    try:
+        os.makedirs(LOGS_DIR, exist_ok=True)
+
+        timestamp = datetime.now().strftime("%Y-%m-%d")
+        report_file = os.path.join(LOGS_DIR, f"relatorio_conformidade_{timestamp}.json")
+
+        report = {
+            "data": timestamp,
+            "total_violacoes": violations_count,
+            "sistema": "Controle de Uniformes - Qualidade",
+            "area": "Zona de Alta Higiene - Embalagem",
+            "threshold_confianca": CONFIDENCE_THRESHOLD
+        }
+
+        # Saída compacta: sem indentação nem o caminho lento de ensure_ascii=False
+        if orjson is not None:
+            with open(report_file, 'wb') as f:
+                f.write(orjson.dumps(report))
+        else:
             with open(report_file, 'w', encoding='utf-8') as f:
-                json.dump(report, f, indent=4, ensure_ascii=False)
+                json.dump(report, f, separators=(',', ':'))
 
-            logger.info(f"Relatório gerado: {report_file}")
+        logger.info(f"Relatório gerado: {report_file}")
 
-        except Exception as e:
-            logger.error(f"Erro ao gerar relatório: {e}")
+    except Exception as e:
+        logger.error(f"Erro ao gerar relatório: {e}")
+
+
+# ==============================================================================
+# LISTAS DE ENTRADAS
+# ==============================================================================
+
+def list_images(directory_path):
+    """
+    Lista as imagens de um diretório (não recursivo)
+
+    Args:
+        directory_path: Diretório com imagens
+
+    Returns:
+        Lista de caminhos de imagem
+    """
+    if not os.path.exists(directory_path):
+        raise FileNotFoundError(f"Diretório não encontrado: {directory_path}")
+
+    with os.scandir(directory_path) as entries:
+        return [
+            entry.path for entry in entries
+            if os.path.splitext(entry.name)[1].lower() in VALID_EXTENSIONS
+            and entry.is_file()
+        ]
+
+
+def load_manifest(manifest_path):
+    """
+    Lê um manifesto com um caminho de imagem por linha
+
+    Linhas vazias e comentários (#) são ignorados. Caminhos relativos são
+    resolvidos a partir do diretório do manifesto.
+
+    Args:
+        manifest_path: Caminho do arquivo de manifesto
+
+    Returns:
+        Lista de caminhos de imagem, na ordem do manifesto
+    """
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        lines = f.read().splitlines()
+
+    image_paths = []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        image_paths.append(os.path.join(base_dir, line))
+
+    return image_paths
 
 
 # ==============================================================================
 # FUNÇÃO PRINCIPAL
 # ==============================================================================
 
-def main():
+def parse_args(argv=None):
+    """
+    Interpreta os argumentos de linha de comando
+
+    Args:
+        argv: Lista de argumentos (padrão: sys.argv)
+
+    Returns:
+        argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(
+        description="Guardian EPI - Controle de Uniformes (Departamento de Qualidade)"
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--image', help="Verificar uma entrada única")
+    mode.add_argument('--dir', help="Processar todas as imagens de um diretório")
+    mode.add_argument('--manifest',
+                      help="Processar as imagens listadas em um arquivo (uma por linha)")
+    mode.add_argument('--interactive', action='store_true',
+                      help="Usar o menu interativo (padrão sem outro modo)")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                        help="Número de imagens por inferência")
+    parser.add_argument('--report', action='store_true',
+                        help="Gerar relatório de conformidade ao final")
+    parser.add_argument('--socket', nargs='?', const=SERVICE_SOCKET_PATH,
+                        help="Usar o serviço persistente (servico_uniforme.py) "
+                             f"em vez de carregar o modelo (padrão: {SERVICE_SOCKET_PATH})")
+
+    args = parser.parse_args(argv)
+    if args.batch_size < 1:
+        parser.error("--batch-size deve ser maior que zero")
+    if args.socket and not (args.image or args.dir or args.manifest or args.report):
+        parser.error("--socket requer --image, --dir, --manifest ou --report")
+
+    return args
+
+
+def interactive_menu():
+    """
+    Menu interativo original (modo padrão sem argumentos)
+    """
+    print("Selecione o modo de operação:")
+    print("1 - Verificar uma entrada única")
+    print("2 - Processar múltiplas entradas (diretório)")
+    print("3 - Gerar relatório de conformidade")
+    print()
+
+    choice = input("Escolha uma opção (1-3): ").strip()
+
+    if choice == '1':
+        image_path = input("Digite o caminho da imagem: ").strip()
+        controle = ControleUniforme()
+        controle.process_entry(image_path)
+
+    elif choice == '2':
+        directory = input("Digite o caminho do diretório: ").strip()
+        controle = ControleUniforme()
+        controle.process_directory(directory)
+        controle.generate_compliance_report()
+
+    elif choice == '3':
+        # Relatório não precisa do modelo (evita carregar o TensorFlow)
+        generate_compliance_report()
+        print(f"\nRelatório salvo em: {os.path.abspath(LOGS_DIR)}")
+
+    else:
+        print("Opção inválida!")
+        return 1
+
+    return 0
+
+
+def run_remote(args):
+    """
+    Executa o modo pedido pelo serviço persistente
+
+    O modelo fica carregado no serviço; aqui só é feita a listagem das
+    imagens e a exibição dos resultados. As violações são registradas
+    pelo serviço.
+
+    Args:
+        args: argparse.Namespace de parse_args (com args.socket)
+    """
+    from servico_uniforme import UniformeClient
+
+    with UniformeClient(args.socket) as client:
+        if args.image:
+            if not os.path.exists(args.image):
+                raise FileNotFoundError(f"Imagem não encontrada: {args.image}")
+
+            results = client.verify([args.image])
+            if not results:
+                raise ValueError(f"Não foi possível carregar: {args.image}")
+
+            logger.info(f"Processando entrada: {args.image}")
+            _, is_compliant, class_name, confidence = results[0]
+            announce_decision(is_compliant, class_name, confidence)
+
+        elif args.dir or args.manifest:
+            if args.dir:
+                image_paths = list_images(args.dir)
+            else:
+                image_paths = load_manifest(args.manifest)
+
+            if not image_paths:
+                logger.warning("Nenhuma imagem para processar")
+            else:
+                approved = 0
+                denied = 0
+
+                # Lotes enviados um a um para exibir o progresso durante o turno
+                for start in range(0, len(image_paths), args.batch_size):
+                    chunk = image_paths[start:start + args.batch_size]
+                    for image_path, is_compliant, class_name, confidence in client.verify(chunk):
+                        print_entry_result(image_path, is_compliant, class_name, confidence)
+                        if is_compliant:
+                            approved += 1
+                        else:
+                            denied += 1
+
+                print_summary(len(image_paths), approved, denied)
+
+        if args.report:
+            violations = client.report()
+            print(f"\nRelatório gerado pelo serviço ({violations} violações registradas)")
+
+
+def main(argv=None):
     """
     Função principal - demonstração do sistema
+
+    Args:
+        argv: Lista de argumentos (padrão: sys.argv)
     """
+    args = parse_args(argv)
+
     print("=" * 70)
     print("GUARDIAN EPI - Controle de Uniformes (Departamento de Qualidade)")
     print("=" * 70)
@@ -432,35 +1278,38 @@ def main():
     print()
 
     try:
-        # Inicializar sistema
-        controle = ControleUniforme()
-
-        # Menu
-        print("Selecione o modo de operação:")
-        print("1 - Verificar uma entrada única")
-        print("2 - Processar múltiplas entradas (diretório)")
-        print("3 - Gerar relatório de conformidade")
-        print()
-
-        choice = input("Escolha uma opção (1-3): ").strip()
-
-        if choice == '1':
-            image_path = input("Digite o caminho da imagem: ").strip()
-            controle.process_entry(image_path)
+        if args.socket:
+            run_remote(args)
+            controle = None
+
+        elif args.image:
+            controle = ControleUniforme()
+            controle.process_entry(args.image)
+
+        elif args.dir:
+            controle = ControleUniforme()
+            controle.process_directory(args.dir, args.batch_size)
+
+        elif args.manifest:
+            image_paths = load_manifest(args.manifest)
+            controle = ControleUniforme()
+            controle.process_paths(image_paths, args.batch_size)
+
+        elif args.report:
+            # Só o relatório: não precisa do modelo (evita carregar o TensorFlow)
+            generate_compliance_report()
+            print(f"\nRelatório salvo em: {os.path.abspath(LOGS_DIR)}")
+            controle = None
 
-        elif choice == '2':
-            directory = input("Digite o caminho do diretório: ").strip()
-            controle.process_directory(directory)
-            controle.generate_compliance_report()
+        else:
+            if interactive_menu() != 0:
+                return 1
+            controle = None
 
-        elif choice == '3':
+        if controle is not None and args.report:
             controle.generate_compliance_report()
             print(f"\nRelatório salvo em: {os.path.abspath(LOGS_DIR)}")
 
-        else:
-            print("Opção inválida!")
-            return 1
-
         print("\n✓ Processamento concluído!")
 
     except Exception as e:
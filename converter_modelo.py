@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Guardian EPI - Conversão de Modelos para Inferência Otimizada
+Autor: Sistema Guardian EPI
+Data: 2025
+
+Converte uma única vez o modelo Keras (.h5) exportado pelo Teachable Machine
+para um formato de inferência mais leve, carregado diretamente pelos módulos
+do sistema em vez do runtime Keras completo.
+
+FORMATOS SUPORTADOS (definido pela extensão do arquivo de saída):
+- .tflite: TensorFlow Lite (float32 ou INT8 com dataset de calibração)
+- .onnx: ONNX para o ONNX Runtime (requer tf2onnx)
+- .xml: IR OpenVINO (float ou INT8 via NNCF; requer openvino e nncf)
+
+Uso:
+    python converter_modelo.py models/uniforme_model.h5 \\
+        models/uniforme_model_int8.tflite --int8 \\
+        --calibration-dir logs/controle_qualidade
+
+    python converter_modelo.py models/uniforme_model.h5 models/uniforme_model.onnx
+
+    python converter_modelo.py models/objeto_model.h5 \\
+        models/objeto_model_int8.xml --int8 \\
+        --calibration-dir logs/deteccao_objetos
+"""
+
+import os
+import sys
+import argparse
+import logging
+import cv2
+import numpy as np
+
+# ==============================================================================
+# CONFIGURAÇÕES
+# ==============================================================================
+
+IMG_SIZE = 224  # Tamanho padrão do Teachable Machine
+
+# Quantidade de imagens usadas na calibração INT8
+CALIBRATION_SAMPLES = 100
+
+CALIBRATION_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+# Opset ONNX alvo da conversão
+ONNX_OPSET = 17
+
+# ==============================================================================
+# CONFIGURAÇÃO DE LOGGING
+# ==============================================================================
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+# ==============================================================================
+# FUNÇÕES DE CONVERSÃO
+# ==============================================================================
+
+def load_keras_model(model_path):
+    """
+    Carrega o modelo .h5 do Teachable Machine
+
+    Args:
+        model_path: Caminho para o arquivo .h5
+
+    Returns:
+        Modelo keras carregado
+    """
+    from tensorflow import keras
+
+    # Fix para compatibilidade com TensorFlow 2.20+
+    # Remove o parâmetro 'groups' do DepthwiseConv2D
+    class DepthwiseConv2DFixed(keras.layers.DepthwiseConv2D):
+        def __init__(self, *args, **kwargs):
+            kwargs.pop('groups', None)
+            super().__init__(*args, **kwargs)
+
+    return keras.models.load_model(
+        model_path,
+        compile=False,
+        custom_objects={'DepthwiseConv2D': DepthwiseConv2DFixed}
+    )
+
+
+def find_calibration_images(calibration_dir, max_samples=CALIBRATION_SAMPLES):
+    """
+    Lista imagens de calibração (busca recursiva)
+
+    As imagens são escolhidas alternadamente entre os subdiretórios (p.ex.
+    um por classe, como com_epi/ e sem_epi/), para que a calibração não
+    veja só a primeira classe quando ela sozinha já tem max_samples imagens.
+    A ordem é determinística.
+
+    Args:
+        calibration_dir: Diretório com imagens representativas
+        max_samples: Número máximo de imagens
+
+    Returns:
+        Lista de caminhos de imagem
+    """
+    groups = []
+    for root, dirs, files in os.walk(calibration_dir):
+        dirs.sort()  # os.walk respeita a ordem da lista alterada in-place
+        images = [
+            os.path.join(root, name) for name in sorted(files)
+            if name.lower().endswith(CALIBRATION_EXTENSIONS)
+        ]
+        if images:
+            groups.append(images)
+
+    # Intercala os diretórios: 1ª de cada, 2ª de cada, ...
+    image_paths = []
+    for i in range(max((len(group) for group in groups), default=0)):
+        for group in groups:
+            if i < len(group):
+                image_paths.append(group[i])
+                if len(image_paths) == max_samples:
+                    return image_paths
+    return image_paths
+
+
+def representative_dataset(image_paths, img_size=IMG_SIZE):
+    """
+    Gera amostras pré-processadas exatamente como na inferência
+
+    Args:
+        image_paths: Imagens de calibração
+        img_size: Resolução de entrada do modelo
+
+    Yields:
+        Lista com um tensor (1, img_size, img_size, 3) float32 em [0, 1]
+    """
+    for image_path in image_paths:
+        image = cv2.imread(image_path)
+        if image is None:
+            logger.warning(f"Imagem de calibração ignorada: {image_path}")
+            continue
+
+        # Mesmo pipeline dos módulos: redimensiona com INTER_AREA, depois
+        # BGR->RGB e normalização
+        image_resized = cv2.resize(image, (img_size, img_size), interpolation=cv2.INTER_AREA)
+        image_normalized = np.multiply(image_resized[..., ::-1], np.float32(1 / 255), dtype=np.float32)
+
+        yield [np.expand_dims(image_normalized, axis=0)]
+
+
+def convert_to_tflite(model, output_path, calibration_dir=None, io_type='uint8',
+                      max_samples=CALIBRATION_SAMPLES, img_size=IMG_SIZE):
+    """
+    Converte o modelo keras para TensorFlow Lite
+
+    Sem calibration_dir gera um modelo float32; com ele aplica quantização
+    INT8 completa (pesos, ativações e tensores de entrada/saída).
+
+    Args:
+        model: Modelo keras carregado
+        output_path: Caminho do arquivo .tflite gerado
+        calibration_dir: Diretório com imagens representativas (INT8)
+        io_type: Tipo dos tensores de entrada/saída INT8 ('uint8' ou 'int8')
+        max_samples: Número de imagens de calibração
+        img_size: Resolução de entrada do modelo
+
+    Returns:
+        Caminho do modelo gerado
+    """
+    import tensorflow as tf
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+
+    if calibration_dir is not None:
+        image_paths = find_calibration_images(calibration_dir, max_samples)
+        if not image_paths:
+            raise FileNotFoundError(f"Nenhuma imagem de calibração em: {calibration_dir}")
+
+        logger.info(f"Calibrando INT8 com {len(image_paths)} imagens de {calibration_dir}")
+
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = lambda: representative_dataset(image_paths, img_size)
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = getattr(tf, io_type)
+        converter.inference_output_type = getattr(tf, io_type)
+
+    tflite_model = converter.convert()
+
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    with open(output_path, 'wb') as f:
+        f.write(tflite_model)
+
+    logger.info(f"Modelo TFLite salvo: {output_path} ({len(tflite_model) / 1e6:.1f} MB)")
+
+    return output_path
+
+
+def convert_to_onnx(model, output_path, opset=ONNX_OPSET, img_size=IMG_SIZE):
+    """
+    Converte o modelo keras para ONNX (batch dinâmico)
+
+    Args:
+        model: Modelo keras carregado
+        output_path: Caminho do arquivo .onnx gerado
+        opset: Versão do opset ONNX
+        img_size: Resolução de entrada do modelo
+
+    Returns:
+        Caminho do modelo gerado
+    """
+    import tensorflow as tf
+    import tf2onnx
+
+    input_signature = [tf.TensorSpec((None, img_size, img_size, 3), tf.float32, name='input')]
+
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    tf2onnx.convert.from_keras(
+        model,
+        input_signature=input_signature,
+        opset=opset,
+        output_path=output_path
+    )
+
+    logger.info(f"Modelo ONNX salvo: {output_path} ({os.path.getsize(output_path) / 1e6:.1f} MB)")
+
+    return output_path
+
+
+def convert_to_openvino(model, output_path, calibration_dir=None,
+                        max_samples=CALIBRATION_SAMPLES, img_size=IMG_SIZE):
+    """
+    Converte o modelo keras para IR OpenVINO (.xml + .bin)
+
+    Com calibration_dir aplica quantização pós-treinamento INT8 via NNCF,
+    executada pelos kernels VNNI/AMX/AVX2 do plugin CPU.
+
+    Args:
+        model: Modelo keras carregado
+        output_path: Caminho do arquivo .xml gerado (o .bin fica ao lado)
+        calibration_dir: Diretório com imagens representativas (INT8)
+        max_samples: Número de imagens de calibração
+        img_size: Resolução de entrada do modelo
+
+    Returns:
+        Caminho do modelo gerado
+    """
+    import openvino as ov
+
+    ov_model = ov.convert_model(
+        model,
+        input=[ov.PartialShape([-1, img_size, img_size, 3])]
+    )
+
+    if calibration_dir is not None:
+        import nncf
+
+        image_paths = find_calibration_images(calibration_dir, max_samples)
+        if not image_paths:
+            raise FileNotFoundError(f"Nenhuma imagem de calibração em: {calibration_dir}")
+
+        logger.info(f"Calibrando INT8 com {len(image_paths)} imagens de {calibration_dir}")
+
+        samples = list(representative_dataset(image_paths, img_size))
+        calibration_dataset = nncf.Dataset(samples, lambda sample: sample[0])
+        ov_model = nncf.quantize(ov_model, calibration_dataset, subset_size=len(samples))
+
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    ov.save_model(ov_model, output_path)
+
+    logger.info(f"Modelo OpenVINO salvo: {output_path}")
+
+    return output_path
+
+
+# ==============================================================================
+# FUNÇÃO PRINCIPAL
+# ==============================================================================
+
+def main():
+    """
+    Função principal - conversão via linha de comando
+    """
+    parser = argparse.ArgumentParser(
+        description="Converte modelos Keras do Teachable Machine para inferência otimizada"
+    )
+    parser.add_argument('model', help="Caminho do modelo keras (.h5)")
+    parser.add_argument('output', help="Caminho do modelo convertido (.tflite, .onnx ou .xml)")
+    parser.add_argument('--int8', action='store_true',
+                        help="Aplicar quantização INT8 (requer --calibration-dir)")
+    parser.add_argument('--calibration-dir',
+                        help="Diretório com imagens representativas para calibração")
+    parser.add_argument('--num-samples', type=int, default=CALIBRATION_SAMPLES,
+                        help="Número de imagens de calibração")
+    parser.add_argument('--io-type', choices=['uint8', 'int8'], default='uint8',
+                        help="Tipo dos tensores de entrada/saída do modelo INT8")
+    parser.add_argument('--img-size', type=int, default=IMG_SIZE,
+                        help="Resolução de entrada do modelo")
+    parser.add_argument('--opset', type=int, default=ONNX_OPSET,
+                        help="Opset ONNX (apenas saída .onnx)")
+    args = parser.parse_args()
+
+    output_format = os.path.splitext(args.output)[1].lower()
+    if output_format not in ('.tflite', '.onnx', '.xml'):
+        parser.error("Saída deve terminar em .tflite, .onnx ou .xml")
+
+    if args.int8 and not args.calibration_dir:
+        parser.error("--int8 requer --calibration-dir")
+
+    if args.int8 and output_format == '.onnx':
+        parser.error("--int8 só é suportado para saída .tflite ou .xml")
+
+    try:
+        logger.info(f"Carregando modelo: {args.model}")
+        model = load_keras_model(args.model)
+
+        if output_format == '.onnx':
+            convert_to_onnx(model, args.output, opset=args.opset, img_size=args.img_size)
+        elif output_format == '.xml':
+            convert_to_openvino(
+                model,
+                args.output,
+                calibration_dir=args.calibration_dir if args.int8 else None,
+                max_samples=args.num_samples,
+                img_size=args.img_size
+            )
+        else:
+            convert_to_tflite(
+                model,
+                args.output,
+                calibration_dir=args.calibration_dir if args.int8 else None,
+                io_type=args.io_type,
+                max_samples=args.num_samples,
+                img_size=args.img_size
+            )
+
+    except Exception as e:
+        logger.error(f"Erro na conversão: {e}")
+        print(f"\n❌ Erro: {e}")
+        return 1
+
+    print("\n✓ Conversão concluída!")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -48,12 +48,12 @@ test_images = [
 ]
 
 def preprocess_image(image):
-    """Pré-processa imagem"""
-    image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-    image_resized = cv2.resize(image_rgb, (IMG_SIZE, IMG_SIZE))
-    image_normalized = image_resized.astype(np.float32) / 255.0
-    image_batch = np.expand_dims(image_normalized, axis=0)
-    return image_batch
+    """Pré-processa imagem (mesmo pipeline do monitor_epi.py)"""
+    # Redimensionar primeiro (INTER_AREA: filtro de caixa, sem aliasing na redução)
+    image_resized = cv2.resize(image, (IMG_SIZE, IMG_SIZE), interpolation=cv2.INTER_AREA)
+    # BGR para RGB via view invertida + normalizar para [0, 1]
+    image_normalized = np.multiply(image_resized[..., ::-1], np.float32(1 / 255), dtype=np.float32)
+    return image_normalized[np.newaxis]
 
 for img_path, expected in test_images:
     print("=" * 70)
@@ -40,33 +40,101 @@ em tempo real com localização precisa do objeto.
 """
 
 import os
+import sys
+import platform
 import cv2
 import numpy as np
 from datetime import datetime
-from tensorflow import keras
 import logging
+import functools
 import json
 import threading
+import queue
 import time
+import atexit
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson  # Opcional: serialização JSON em C
+except ImportError:
+    orjson = None
+
+# Paralelismo interno do OpenCV limitado: inferência, captura e exibição já
+# rodam em threads próprias
+cv2.setNumThreads(min(os.cpu_count() or 1, 4))
 
 # ==============================================================================
 # CONFIGURAÇÕES
 # ==============================================================================
 
-# Caminhos do modelo
-MODEL_PATH = "models/objeto_model.h5"
+# Caminhos do modelo Teachable Machine
+KERAS_MODEL_PATH = "models/objeto_model.h5"
+
+# Modelos INT8 gerados por converter_modelo.py (usados quando existirem)
+OPENVINO_MODEL_PATH = "models/objeto_model_int8.xml"   # x86 (VNNI/AMX/AVX2)
+TFLITE_MODEL_PATH = "models/objeto_model_int8.tflite"  # ARM (NEON SDOT/UDOT)
+
+# Em caixas de borda ARM o TFLite vem primeiro; em x86, o OpenVINO
+IS_ARM = platform.machine().lower() in ('aarch64', 'arm64', 'armv7l', 'armv8l')
+_PREFERRED_MODELS = (
+    (TFLITE_MODEL_PATH, OPENVINO_MODEL_PATH) if IS_ARM
+    else (OPENVINO_MODEL_PATH, TFLITE_MODEL_PATH)
+)
+
+MODEL_PATH = next(
+    (path for path in _PREFERRED_MODELS if os.path.exists(path)),
+    KERAS_MODEL_PATH
+)
 LABELS_PATH = "models/objeto_labels.txt"
 
 # Diretório para logs
 LOGS_DIR = "logs/deteccao_objetos"
 
 # Configurações do modelo
-IMG_SIZE = 224
+# Resolução de entrada do modelo (Teachable Machine: 224). Um modelo
+# retreinado em resolução menor (p.ex. 128, ~3x menos MACs) pode ser usado
+# como portão rápido: GUARDIAN_IMG_SIZE=128 e conversão com --img-size 128
+DEFAULT_IMG_SIZE = 224
+_IMG_SIZE_ENV = os.getenv("GUARDIAN_IMG_SIZE")
+try:
+    IMG_SIZE = int(_IMG_SIZE_ENV) if _IMG_SIZE_ENV else DEFAULT_IMG_SIZE
+    if IMG_SIZE <= 0:
+        raise ValueError
+    _IMG_SIZE_INVALID = False
+except ValueError:
+    # Registrado após a configuração do logging (abaixo)
+    IMG_SIZE = DEFAULT_IMG_SIZE
+    _IMG_SIZE_INVALID = True
+PIXEL_SCALE = np.float32(1 / 255)
 CONFIDENCE_THRESHOLD = 0.80  # Alto para evitar falsos positivos
 
+# Trechos que identificam as classes de objeto estranho nos rótulos
+FOREIGN_LABEL_KEYS = ('estranho', 'foreign')
+
 # Configurações de processamento
 FRAME_RATE = 10  # Frames por segundo a processar (ajustar conforme hardware)
 
+# Frames amostrados agrupados em uma única inferência no monitoramento,
+# limitados a ~250 ms de espera para manter a latência do alerta
+BATCH_LATENCY_BUDGET = 0.25  # segundos
+INFER_BATCH = max(1, int(FRAME_RATE * BATCH_LATENCY_BUDGET))
+
+# Imagens das detecções: maior dimensão e qualidade JPEG (suficiente para auditoria)
+SNAPSHOT_MAX_DIM = 640
+SNAPSHOT_JPEG_QUALITY = 80
+
+# Exibir 1 a cada N frames capturados no monitoramento (a inferência já
+# amostra a cada 30 // FRAME_RATE frames)
+DISPLAY_EVERY = 2
+
+# Fonte dos textos sobrepostos ao vídeo do monitoramento
+OVERLAY_FONT = cv2.FONT_HERSHEY_SIMPLEX
+
+# Portão de movimento: só infere quando a miniatura em tons de cinza mudou
+# em relação ao último frame enviado ao modelo
+MOTION_GATE_SIZE = 32
+MOTION_THRESHOLD = 4.0  # Diferença média absoluta por pixel (0-255)
+
 # ==============================================================================
 # CONFIGURAÇÃO DE LOGGING
 # ==============================================================================
@@ -77,6 +145,88 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+if _IMG_SIZE_INVALID:
+    logger.error(f"GUARDIAN_IMG_SIZE inválido ({_IMG_SIZE_ENV!r}): esperado inteiro positivo, "
+                 f"usando {DEFAULT_IMG_SIZE}")
+
+
+# ==============================================================================
+# COMPATIBILIDADE KERAS
+# ==============================================================================
+
+@functools.lru_cache(maxsize=None)
+def _depthwise_conv2d_fixed():
+    """
+    DepthwiseConv2D que ignora o parâmetro 'groups' (TensorFlow 2.20+)
+
+    Criada sob demanda e uma única vez: o TensorFlow só é importado quando
+    um modelo Keras é carregado.
+
+    Returns:
+        Subclasse de keras.layers.DepthwiseConv2D
+    """
+    from tensorflow import keras
+
+    class DepthwiseConv2DFixed(keras.layers.DepthwiseConv2D):
+        def __init__(self, *args, **kwargs):
+            # Remove o parâmetro 'groups' se existir
+            kwargs.pop('groups', None)
+            super().__init__(*args, **kwargs)
+
+    return DepthwiseConv2DFixed
+
+
+# ==============================================================================
+# CAPTURA DE FRAMES
+# ==============================================================================
+
+class _FrameGrabber:
+    """
+    Mantém o buffer da câmera drenado em uma thread dedicada
+
+    A thread chama cap.grab() continuamente (sem decodificar) e só faz o
+    cap.retrieve() do frame mais recente quando read() é chamado. Como só
+    ela acessa o VideoCapture, não há disputa entre grab e retrieve, e uma
+    iteração lenta do laço principal nunca lê frames atrasados.
+    """
+
+    def __init__(self, cap):
+        self.cap = cap
+        self._request = threading.Event()
+        self._stop = threading.Event()
+        self._frames = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            if not self.cap.grab():
+                self._frames.put((False, None))
+                return
+
+            if self._request.is_set():
+                self._request.clear()
+                self._frames.put(self.cap.retrieve())
+
+    def read(self):
+        """
+        Retorna o próximo frame capturado após a chamada
+
+        Returns:
+            tuple: (ret, frame), como cv2.VideoCapture.read()
+        """
+        self._request.set()
+        while True:
+            try:
+                return self._frames.get(timeout=0.5)
+            except queue.Empty:
+                if not self._thread.is_alive():
+                    return False, None
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+
 
 # ==============================================================================
 # CLASSE DETECTOR DE OBJETOS ESTRANHOS
@@ -94,24 +244,44 @@ class DetectorObjetosEstranhos:
     - Geração de relatórios de qualidade
     """
 
-    def __init__(self, model_path=MODEL_PATH, labels_path=LABELS_PATH):
+    def __init__(self, model_path=MODEL_PATH, labels_path=LABELS_PATH, lazy_model=False):
         """
         Inicializa o detector de objetos estranhos
 
         Args:
-            model_path: Caminho para modelo keras
+            model_path: Caminho para modelo keras (.h5), IR OpenVINO (.xml) ou TFLite (.tflite)
             labels_path: Caminho para rótulos
+            lazy_model: Adia o carregamento do modelo (e do TensorFlow) até a
+                primeira detecção, p.ex. para só gerar o relatório
         """
         self.model = None
+        self.interpreter = None
+        self.backend = None  # 'keras', 'openvino' ou 'tflite'
         self.labels = []
         self.model_path = model_path
         self.labels_path = labels_path
 
+        # Buffers reutilizados a cada frame por preprocess_image
+        self._resize_buf = np.empty((IMG_SIZE, IMG_SIZE, 3), dtype=np.uint8)
+        self._input_buf = np.empty((1, IMG_SIZE, IMG_SIZE, 3), dtype=np.float32)
+        self._batch_buf = np.empty((INFER_BATCH, IMG_SIZE, IMG_SIZE, 3), dtype=np.float32)
+
         # Criar diretório de logs
         os.makedirs(LOGS_DIR, exist_ok=True)
 
+        # Log de detecções aberto uma única vez (com buffer de linha), e
+        # gravação em segundo plano (uma thread preserva a ordem)
+        self._log_fh = open(
+            os.path.join(LOGS_DIR, "deteccoes_objetos.log"), 'a',
+            buffering=1, encoding='utf-8'
+        )
+        self._io_pool = ThreadPoolExecutor(max_workers=1)
+        atexit.register(self.close)
+
         # Carregar modelo
-        self._load_model()
+        self._model_loaded = False
+        if not lazy_model:
+            self._ensure_model()
         self._load_labels()
 
         # Contadores
@@ -122,8 +292,19 @@ class DetectorObjetosEstranhos:
         # Estado da linha
         self.line_running = True
 
+        # Texto de estatísticas do overlay (refeito só quando os contadores mudam)
+        self._update_stats_str()
+
         logger.info("Detector de Objetos Estranhos inicializado")
 
+    def _ensure_model(self):
+        """
+        Carrega o modelo na primeira chamada (ver lazy_model)
+        """
+        if not self._model_loaded:
+            self._load_model()
+            self._model_loaded = True
+
     def _load_model(self):
         """
         Carrega modelo de detecção de objetos estranhos
@@ -145,6 +326,10 @@ class DetectorObjetosEstranhos:
         - Treinar com imagens da linha real em diferentes horários
         - Incluir augmentation (rotação, blur, mudança de brilho)
         - Considerar usar múltiplas câmeras em diferentes ângulos
+
+        Se o caminho apontar para um .xml ou .tflite (INT8, gerados por
+        converter_modelo.py), a inferência usa o OpenVINO Runtime ou o
+        TFLite Interpreter em vez do runtime Keras.
         """
         try:
             if not os.path.exists(self.model_path):
@@ -153,35 +338,184 @@ class DetectorObjetosEstranhos:
                 logger.warning("Classes: produto_limpo, objeto_estranho")
                 return
 
-            # Fix para compatibilidade com TensorFlow 2.20+
-            # Remove o parâmetro 'groups' do DepthwiseConv2D
-            import tensorflow as tf
+            if self.model_path.endswith('.xml'):
+                self._load_openvino_model()
+            elif self.model_path.endswith('.tflite'):
+                self._load_tflite_model()
+            else:
+                self._load_keras_model()
 
-            # Carrega o modelo com custom object
-            with tf.keras.utils.custom_object_scope({}):
-                # Cria uma classe wrapper para DepthwiseConv2D que ignora 'groups'
-                original_depthwise = tf.keras.layers.DepthwiseConv2D
+            self._warmup_model()
 
-                class DepthwiseConv2DFixed(original_depthwise):
-                    def __init__(self, *args, **kwargs):
-                        # Remove o parâmetro 'groups' se existir
-                        kwargs.pop('groups', None)
-                        super().__init__(*args, **kwargs)
+        except Exception as e:
+            logger.error(f"Erro ao carregar modelo: {e}")
+            raise
 
-                # Substitui temporariamente
-                tf.keras.layers.DepthwiseConv2D = DepthwiseConv2DFixed
+    def _load_keras_model(self):
+        """
+        Carrega o modelo .h5 no runtime Keras (fallback sem conversão)
+        """
+        # Import tardio: o TensorFlow só é inicializado quando há modelo
+        import tensorflow as tf
+        from tensorflow import keras
+
+        # Fix para compatibilidade com TensorFlow 2.20+: a camada corrigida é
+        # passada via custom_objects, sem trocar a classe global do Keras
+        self.model = keras.models.load_model(
+            self.model_path,
+            compile=False,
+            custom_objects={'DepthwiseConv2D': _depthwise_conv2d_fixed()}
+        )
+
+        self._check_input_size(self.model.input_shape)
+
+        # Grafo traçado uma única vez: evita o overhead de model.predict
+        # (callbacks, checagens de estratégia, cópias) a cada frame
+        def trace(jit_compile):
+            return tf.function(
+                lambda x: self.model(x, training=False),
+                input_signature=[tf.TensorSpec([None, IMG_SIZE, IMG_SIZE, 3], tf.float32)],
+                jit_compile=jit_compile
+            ).get_concrete_function()
+
+        # XLA funde Conv+BN+ReLU em menos kernels; erros de compilação só
+        # aparecem na primeira execução, por isso o teste com entrada nula
+        try:
+            infer = trace(jit_compile=True)
+            infer(tf.zeros([1, IMG_SIZE, IMG_SIZE, 3], tf.float32))
+            logger.info("Inferência compilada com XLA")
+        except Exception as e:
+            logger.warning(f"XLA indisponível, usando grafo padrão: {e}")
+            infer = trace(jit_compile=False)
 
-                try:
-                    self.model = keras.models.load_model(self.model_path, compile=False)
-                finally:
-                    # Restaura a classe original
-                    tf.keras.layers.DepthwiseConv2D = original_depthwise
+        self._infer = lambda batch: infer(tf.constant(batch)).numpy()
+
+        self.backend = 'keras'
+        logger.info(f"Modelo carregado: {self.model_path}")
+
+    def _check_input_size(self, input_shape):
+        """
+        Confere se a entrada do modelo corresponde a IMG_SIZE
+
+        Args:
+            input_shape: Forma NHWC da entrada (dimensões dinâmicas como None)
+        """
+        height, width = input_shape[1], input_shape[2]
+        if (height, width) != (IMG_SIZE, IMG_SIZE) and None not in (height, width):
+            raise ValueError(
+                f"Modelo {self.model_path} espera entrada {height}x{width}, "
+                f"mas IMG_SIZE={IMG_SIZE} (ajuste GUARDIAN_IMG_SIZE)"
+            )
+
+    def _warmup_model(self):
+        """
+        Executa uma inferência com entrada nula logo após o carregamento
 
-            logger.info(f"Modelo carregado: {self.model_path}")
+        A primeira chamada aloca os kernels (e, com XLA, compila cada forma
+        de lote); assim esse custo não cai sobre o primeiro frame da esteira.
+        Aquece tanto a imagem única quanto o lote do monitoramento.
+        """
+        try:
+            start = time.perf_counter()
+            for batch_size in sorted({1, INFER_BATCH}):
+                self._run_inference(np.zeros((batch_size, IMG_SIZE, IMG_SIZE, 3), dtype=np.float32))
+            logger.info(f"Aquecimento do modelo: {(time.perf_counter() - start) * 1000:.0f} ms")
 
         except Exception as e:
-            logger.error(f"Erro ao carregar modelo: {e}")
-            raise
+            logger.warning(f"Falha no aquecimento do modelo: {e}")
+
+    def _load_openvino_model(self):
+        """
+        Compila o IR OpenVINO (INT8 via NNCF) para CPU
+
+        As convoluções quantizadas usam instruções VNNI/AMX (Xeon) ou AVX2,
+        e o executor do OpenVINO já paraleliza a inferência. A precisão INT8
+        vem do próprio IR quantizado; o hint LATENCY otimiza para um frame
+        por vez.
+        """
+        import openvino as ov
+
+        core = ov.Core()
+        compiled = core.compile_model(self.model_path, "CPU", {"PERFORMANCE_HINT": "LATENCY"})
+
+        self._check_input_size([
+            dim.get_length() if dim.is_static else None
+            for dim in compiled.input(0).get_partial_shape()
+        ])
+
+        self.model = compiled
+        self._infer_request = compiled.create_infer_request()
+        self._ov_output = compiled.output(0)
+        self.backend = 'openvino'
+
+        logger.info(f"Modelo OpenVINO carregado: {self.model_path}")
+
+    def _load_tflite_model(self):
+        """
+        Carrega o modelo TFLite INT8 e aloca os tensores uma única vez
+
+        Usa o tflite_runtime (leve, sem o TensorFlow completo) quando
+        instalado na caixa de borda; senão, o tf.lite. Em ambos o resolver
+        padrão aplica o XNNPACK aos kernels de Conv/DepthwiseConv.
+        """
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+
+        self.interpreter = Interpreter(model_path=self.model_path, num_threads=os.cpu_count())
+        self.interpreter.allocate_tensors()
+
+        self._input_details = self.interpreter.get_input_details()[0]
+        self._output_details = self.interpreter.get_output_details()[0]
+        self._check_input_size(self._input_details['shape'].tolist())
+        self.backend = 'tflite'
+
+        logger.info(f"Modelo TFLite carregado: {self.model_path} "
+                    f"(entrada {self._input_details['dtype'].__name__})")
+
+    def _run_inference(self, batch):
+        """
+        Executa o modelo carregado sobre um lote pré-processado
+
+        Args:
+            batch: Array float32 (N, IMG_SIZE, IMG_SIZE, 3) normalizado em [0, 1]
+
+        Returns:
+            Array float32 (N, num_classes) com as probabilidades
+        """
+        if self.backend == 'openvino':
+            return self._infer_request.infer({0: batch})[self._ov_output]
+
+        if self.backend == 'keras':
+            return self._infer(batch)
+
+        if self._input_details['shape'][0] != len(batch):
+            # Redimensionar o tensor de entrada para o tamanho do lote
+            self.interpreter.resize_tensor_input(self._input_details['index'], batch.shape)
+            self.interpreter.allocate_tensors()
+            self._input_details = self.interpreter.get_input_details()[0]
+            self._output_details = self.interpreter.get_output_details()[0]
+
+        input_details = self._input_details
+        if input_details['dtype'] != np.float32:
+            # Quantizar entrada com a escala/zero-point do modelo INT8
+            scale, zero_point = input_details['quantization']
+            info = np.iinfo(input_details['dtype'])
+            batch = np.clip(np.rint(batch / scale + zero_point), info.min, info.max)
+            batch = batch.astype(input_details['dtype'])
+
+        self.interpreter.set_tensor(input_details['index'], batch)
+        self.interpreter.invoke()
+        predictions = self.interpreter.get_tensor(self._output_details['index'])
+
+        if predictions.dtype != np.float32:
+            # Dequantizar a saída para probabilidades
+            scale, zero_point = self._output_details['quantization']
+            predictions = (predictions.astype(np.float32) - zero_point) * scale
+
+        return predictions
 
     def _load_labels(self):
         """
@@ -192,41 +526,56 @@ class DetectorObjetosEstranhos:
                 logger.warning(f"Arquivo de rótulos não encontrado: {self.labels_path}")
                 # Rótulos padrão para demonstração
                 self.labels = ['produto_limpo', 'objeto_estranho']
-                return
-
-            with open(self.labels_path, 'r', encoding='utf-8') as f:
-                self.labels = [line.strip() for line in f.readlines()]
-
-            logger.info(f"Rótulos: {self.labels}")
+            else:
+                # Uma leitura só; rótulos internados (comparados por
+                # identidade) e linhas em branco ignoradas
+                with open(self.labels_path, 'r', encoding='utf-8') as f:
+                    self.labels = [
+                        sys.intern(line.strip()) for line in f.read().splitlines() if line.strip()
+                    ]
+
+                logger.info(f"Rótulos: {self.labels}")
+
+            # Índices das classes de objeto estranho (o conjunto de rótulos é
+            # fixo: nenhuma operação de string por frame)
+            self._foreign_idx_set = frozenset(
+                i for i, label in enumerate(self.labels)
+                if any(key in label.lower() for key in FOREIGN_LABEL_KEYS)
+            )
 
         except Exception as e:
             logger.error(f"Erro ao carregar rótulos: {e}")
             raise
 
-    def preprocess_image(self, image):
+    def preprocess_image(self, image, out=None):
         """
         Pré-processa imagem da esteira para inferência
 
+        Redimensiona primeiro (menor buffer) e faz BGR->RGB + normalização em
+        uma única passada, escrevendo nos buffers pré-alocados: nenhuma
+        alocação por frame. O array retornado é reescrito no próximo frame.
+
         Args:
             image: Frame BGR da câmera
+            out: Destino float32 (IMG_SIZE, IMG_SIZE, 3), p.ex. uma linha de
+                um lote (padrão: buffer de entrada interno)
 
         Returns:
-            Array normalizado para predição
+            Array normalizado (1, IMG_SIZE, IMG_SIZE, 3) para predição
         """
         try:
-            # BGR para RGB
-            image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-
-            # Redimensionar
-            image_resized = cv2.resize(image_rgb, (IMG_SIZE, IMG_SIZE))
+            if out is None:
+                out = self._input_buf[0]
 
-            # Normalizar
-            image_normalized = image_resized.astype(np.float32) / 255.0
+            # Redimensionar (INTER_AREA: filtro de caixa, mais rápido e sem
+            # aliasing na redução de frames de câmera para IMG_SIZE)
+            cv2.resize(image, (IMG_SIZE, IMG_SIZE), dst=self._resize_buf,
+                       interpolation=cv2.INTER_AREA)
 
-            # Batch dimension
-            image_batch = np.expand_dims(image_normalized, axis=0)
+            # BGR para RGB (view invertida) + normalizar, direto na entrada do modelo
+            np.multiply(self._resize_buf[..., ::-1], PIXEL_SCALE, out=out, dtype=np.float32)
 
-            return image_batch
+            return out[np.newaxis]
 
         except Exception as e:
             logger.error(f"Erro no pré-processamento: {e}")
@@ -243,7 +592,9 @@ class DetectorObjetosEstranhos:
             tuple: (has_foreign_object, class_name, confidence)
         """
         try:
-            if self.model is None:
+            self._ensure_model()
+
+            if self.backend is None:
                 logger.warning("Modelo não carregado - modo demonstração")
                 # Simulação
                 return False, "produto_limpo", 0.98
@@ -252,24 +603,84 @@ class DetectorObjetosEstranhos:
             processed = self.preprocess_image(image)
 
             # Predição
-            predictions = self.model.predict(processed, verbose=0)
+            predictions = self._run_inference(processed)
 
-            # Classe
-            class_index = np.argmax(predictions[0])
-            confidence = predictions[0][class_index]
-            class_name = self.labels[class_index] if class_index < len(self.labels) else "unknown"
+            return self._decide(predictions)[0]
 
-            # Verificar se é objeto estranho
-            has_foreign_object = (
-                'estranho' in class_name.lower() or 'foreign' in class_name.lower()
-            ) and confidence >= CONFIDENCE_THRESHOLD
+        except Exception as e:
+            logger.error(f"Erro na detecção: {e}")
+            raise
+
+    def detect_foreign_objects(self, images):
+        """
+        Detecta objetos estranhos em vários frames com uma única inferência
+
+        O lote tem sempre INFER_BATCH linhas (forma fixa: sem redimensionar
+        tensores nem retraçar o grafo); linhas além de len(images) são
+        ignoradas.
+
+        Args:
+            images: Lista de até INFER_BATCH frames da esteira
+
+        Returns:
+            Lista de tuplas (has_foreign_object, class_name, confidence)
+        """
+        try:
+            self._ensure_model()
+
+            if self.backend is None:
+                logger.warning("Modelo não carregado - modo demonstração")
+                # Simulação
+                return [(False, "produto_limpo", 0.98)] * len(images)
+
+            for i, image in enumerate(images):
+                self.preprocess_image(image, out=self._batch_buf[i])
 
-            return has_foreign_object, class_name, confidence
+            predictions = self._run_inference(self._batch_buf)
+
+            return self._decide(predictions[:len(images)])
 
         except Exception as e:
             logger.error(f"Erro na detecção: {e}")
             raise
 
+    def _decide(self, predictions):
+        """
+        Converte as probabilidades do modelo em decisões
+
+        Args:
+            predictions: Array (N, num_classes)
+
+        Returns:
+            Lista de tuplas (has_foreign_object, class_name, confidence)
+        """
+        results = []
+        for p in predictions:
+            # Classe (modelo binário: uma comparação em Python em vez de
+            # argmax + indexação; empate fica com o índice 0, como no argmax)
+            if len(p) == 2:
+                p0, p1 = p.tolist()
+                class_index, confidence = (1, p1) if p1 > p0 else (0, p0)
+            else:
+                class_index = int(np.argmax(p))
+                confidence = float(p[class_index])
+            class_name = self.labels[class_index] if class_index < len(self.labels) else "unknown"
+
+            # Verificar se é objeto estranho
+            has_foreign_object = (
+                class_index in self._foreign_idx_set and confidence >= CONFIDENCE_THRESHOLD
+            )
+
+            results.append((has_foreign_object, class_name, confidence))
+
+        return results
+
+    def _update_stats_str(self):
+        """
+        Refaz o texto de estatísticas exibido no monitoramento
+        """
+        self._stats_str = f"Deteccoes: {self.detections_count} | Paradas: {self.line_stoppages}"
+
     def stop_production_line(self):
         """
         Simula parada emergencial da linha de produção
@@ -282,6 +693,7 @@ class DetectorObjetosEstranhos:
         """
         self.line_running = False
         self.line_stoppages += 1
+        self._update_stats_str()
 
         logger.critical("🛑 LINHA DE PRODUÇÃO PARADA - OBJETO ESTRANHO DETECTADO!")
         print("\n" + "="*70)
@@ -304,6 +716,9 @@ class DetectorObjetosEstranhos:
         """
         Registra detecção de objeto estranho
 
+        A gravação da imagem e do log é feita em segundo plano (ver
+        _write_detection), sem bloquear o laço da câmera.
+
         Args:
             image: Frame onde foi detectado
             class_name: Classe detectada
@@ -312,22 +727,28 @@ class DetectorObjetosEstranhos:
         try:
             timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
 
-            # Salvar imagem
             image_filename = f"objeto_estranho_{timestamp}.jpg"
             image_path = os.path.join(LOGS_DIR, image_filename)
-            cv2.imwrite(image_path, image)
 
-            # Log em arquivo
-            log_file = os.path.join(LOGS_DIR, "deteccoes_objetos.log")
-            with open(log_file, 'a', encoding='utf-8') as f:
-                log_entry = (
-                    f"[{timestamp}] - DETECÇÃO: Objeto estranho na esteira. "
-                    f"Classe: {class_name}, Confiança: {confidence:.2%}, "
-                    f"Imagem: {image_path}, Parada #{self.line_stoppages}\n"
-                )
-                f.write(log_entry)
+            log_entry = (
+                f"[{timestamp}] - DETECÇÃO: Objeto estranho na esteira. "
+                f"Classe: {class_name}, Confiança: {confidence:.2%}, "
+                f"Imagem: {image_path}, Parada #{self.line_stoppages}\n"
+            )
+
+            # Miniatura para auditoria (já é uma cópia: o chamador pode
+            # continuar desenhando sobre o frame)
+            height, width = image.shape[:2]
+            scale = SNAPSHOT_MAX_DIM / max(height, width)
+            if scale < 1.0:
+                snapshot = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            else:
+                snapshot = image.copy()
+
+            self._io_pool.submit(self._write_detection, snapshot, image_path, log_entry)
 
             self.detections_count += 1
+            self._update_stats_str()
 
             logger.warning(f"⚠️ DETECÇÃO #{self.detections_count}: {class_name} ({confidence:.2%})")
 
@@ -335,6 +756,48 @@ class DetectorObjetosEstranhos:
             logger.error(f"Erro ao registrar detecção: {e}")
             raise
 
+    def _write_detection(self, image, image_path, log_entry):
+        """
+        Grava a imagem e a linha de log da detecção (executado na thread de I/O)
+
+        Args:
+            image: Frame BGR da detecção
+            image_path: Caminho do arquivo .jpg
+            log_entry: Linha do log de detecções
+        """
+        try:
+            # Salvar imagem
+            ok, buffer = cv2.imencode('.jpg', image, [
+                cv2.IMWRITE_JPEG_QUALITY, SNAPSHOT_JPEG_QUALITY,
+                cv2.IMWRITE_JPEG_OPTIMIZE, 1
+            ])
+            if not ok:
+                raise ValueError("falha na codificação JPEG")
+            buffer.tofile(image_path)
+
+            # Log em arquivo
+            self._log_fh.write(log_entry)
+
+        except Exception as e:
+            logger.error(f"Erro ao gravar detecção {image_path}: {e}")
+
+    def flush(self):
+        """
+        Aguarda as gravações de detecções pendentes
+
+        A thread de I/O é única, então uma tarefa vazia só termina depois
+        de todas as anteriores.
+        """
+        self._io_pool.submit(lambda: None).result()
+
+    def close(self):
+        """
+        Aguarda as gravações pendentes e fecha o log de detecções
+        """
+        self._io_pool.shutdown(wait=True)
+        if not self._log_fh.closed:
+            self._log_fh.close()
+
     def process_single_image(self, image_path):
         """
         Processa uma única imagem (para testes)
@@ -369,88 +832,280 @@ class DetectorObjetosEstranhos:
             logger.error(f"Erro ao processar imagem: {e}")
             raise
 
-    def monitor_conveyor_belt(self, video_source=0, duration=60):
+    def _inference_worker(self, frames, stop_event):
         """
-        Monitora esteira transportadora em tempo real via webcam/câmera
+        Thread de inferência: processa os frames mais recentes da fila
+
+        Agrupa até INFER_BATCH frames em uma única inferência e publica
+        (has_foreign, class_name, confidence, frame) em self._last_result;
+        alertas e parada da linha ficam com a thread principal.
+
+        A inferência em código nativo libera o GIL, então a captura e a
+        exibição seguem em paralelo.
 
         Args:
-            video_source: 0 para webcam, ou caminho para vídeo
-            duration: Duração do monitoramento em segundos
+            frames: queue.Queue(maxsize=INFER_BATCH) com os últimos frames amostrados
+            stop_event: threading.Event de encerramento
         """
-        try:
-            # Abrir câmera
-            cap = cv2.VideoCapture(video_source)
+        while not stop_event.is_set():
+            try:
+                batch_frames = [frames.get(timeout=0.1)]
+            except queue.Empty:
+                continue
+
+            # Resultados de frames anteriores a um reset do overlay são descartados
+            with self._result_lock:
+                generation = self._overlay_generation
+
+            # Agrupa os frames que chegarem dentro do orçamento de latência
+            deadline = time.monotonic() + INFER_BATCH / FRAME_RATE
+            while len(batch_frames) < INFER_BATCH:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch_frames.append(frames.get(timeout=remaining))
+                except queue.Empty:
+                    break
 
-            if not cap.isOpened():
-                raise RuntimeError("Não foi possível abrir a câmera")
+            try:
+                results = self.detect_foreign_objects(batch_frames)
+            except Exception as e:
+                # Repassado para a thread principal
+                self._worker_error = e
+                stop_event.set()
+                return
 
-            logger.info(f"Iniciando monitoramento da esteira por {duration}s")
-            logger.info("Pressione 'Q' para parar, 'R' para reiniciar linha")
+            # Publica a primeira detecção do lote (ou o frame mais recente)
+            index = next(
+                (i for i, (has_foreign, _, _) in enumerate(results) if has_foreign),
+                len(results) - 1
+            )
+            has_foreign, class_name, confidence = results[index]
 
-            start_time = time.time()
-            frame_count = 0
+            with self._result_lock:
+                if generation != self._overlay_generation:
+                    continue
+                self._last_result = (has_foreign, class_name, confidence, batch_frames[index])
+                self._result_seq += 1
 
-            while True:
-                # Verificar tempo
-                if time.time() - start_time > duration:
-                    logger.info("Tempo de monitoramento concluído")
-                    break
+    def _reset_overlay(self, frames):
+        """
+        Limpa o último resultado exibido (início do monitoramento e
+        reinício da linha)
 
-                # Capturar frame
-                ret, frame = cap.read()
-                if not ret:
-                    logger.error("Erro ao capturar frame")
-                    break
+        Descarta os frames pendentes e os resultados ainda em inferência, e
+        zera a referência do portão de movimento: o próximo frame amostrado
+        é inferido mesmo com a cena parada, em vez de o overlay manter o
+        alerta antigo.
 
-                frame_count += 1
+        Args:
+            frames: queue.Queue(maxsize=INFER_BATCH) do worker
+        """
+        with self._result_lock:
+            self._last_result = None
+            self._overlay_generation += 1
 
-                # Processar apenas em intervalos (economizar CPU)
-                if frame_count % (30 // FRAME_RATE) == 0:
+        while True:
+            try:
+                frames.get_nowait()
+            except queue.Empty:
+                break
 
-                    # Detectar objetos
-                    has_foreign, class_name, confidence = self.detect_foreign_object(frame)
+        self._prev_small = None
 
-                    # Se linha parada, não processar
-                    if not self.line_running:
-                        cv2.putText(frame, "LINHA PARADA - Pressione R para reiniciar",
-                                   (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
-                    else:
-                        # Mostrar status
-                        if has_foreign:
-                            cv2.putText(frame, f"ALERTA: {class_name} ({confidence:.0%})",
-                                       (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
-                            cv2.putText(frame, "PARANDO LINHA...",
-                                       (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+    def _frame_changed(self, frame):
+        """
+        Compara uma miniatura 32x32 em cinza com a do último frame inferido
 
-                            # Registrar e parar
-                            self.log_detection(frame, class_name, confidence)
-                            self.stop_production_line()
+        A referência só é atualizada quando o frame passa no portão, então
+        mudanças lentas (objeto entrando aos poucos) também acumulam.
 
-                        else:
-                            cv2.putText(frame, f"Operacao Normal - {class_name}",
-                                       (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+        Args:
+            frame: Frame BGR da câmera
 
-                # Mostrar estatísticas
-                cv2.putText(frame, f"Deteccoes: {self.detections_count} | Paradas: {self.line_stoppages}",
-                           (10, frame.shape[0] - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+        Returns:
+            True se o frame deve ir para a inferência
+        """
+        small = cv2.cvtColor(
+            cv2.resize(frame, (MOTION_GATE_SIZE, MOTION_GATE_SIZE), interpolation=cv2.INTER_AREA),
+            cv2.COLOR_BGR2GRAY
+        )
 
-                # Exibir frame
-                cv2.imshow('Monitor de Esteira - Guardian EPI', frame)
+        if self._prev_small is not None:
+            diff = cv2.norm(small, self._prev_small, cv2.NORM_L1)
+            if diff <= MOTION_THRESHOLD * small.size:
+                return False
 
-                # Teclas
-                key = cv2.waitKey(1) & 0xFF
+        self._prev_small = small
+        return True
 
-                if key == ord('q') or key == ord('Q'):
-                    logger.info("Monitoramento interrompido pelo usuário")
-                    break
+    @staticmethod
+    def _submit_latest(frames, frame):
+        """
+        Entrega o frame ao worker descartando o mais antigo se a fila estiver cheia
 
-                if key == ord('r') or key == ord('R'):
-                    if not self.line_running:
-                        self.restart_production_line()
+        Args:
+            frames: queue.Queue(maxsize=INFER_BATCH) do worker
+            frame: Frame BGR a processar
+        """
+        try:
+            frames.put_nowait(frame)
+        except queue.Full:
+            try:
+                frames.get_nowait()
+            except queue.Empty:
+                pass
+            frames.put_nowait(frame)
 
-            # Liberar recursos
-            cap.release()
-            cv2.destroyAllWindows()
+    def monitor_conveyor_belt(self, video_source=0, duration=60):
+        """
+        Monitora esteira transportadora em tempo real via webcam/câmera
+
+        A inferência roda em uma thread separada (ver _inference_worker):
+        a captura/exibição não espera o modelo, e o overlay mostra o último
+        resultado disponível.
+
+        Args:
+            video_source: 0 para webcam, ou caminho para vídeo
+            duration: Duração do monitoramento em segundos
+        """
+        try:
+            # Abrir câmera
+            cap = cv2.VideoCapture(video_source)
+
+            if not cap.isOpened():
+                raise RuntimeError("Não foi possível abrir a câmera")
+
+            if isinstance(video_source, int):
+                # Câmera ao vivo: buffer de 1 frame, MJPG (decodificação JPEG
+                # mais leve que YUYV em USB) e thread de grab dedicada
+                cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+                cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+                grabber = _FrameGrabber(cap)
+                read_frame = grabber.read
+            else:
+                # Arquivo de vídeo: leitura sequencial, sem descartar frames
+                grabber = None
+                read_frame = cap.read
+
+            logger.info(f"Iniciando monitoramento da esteira por {duration}s")
+            logger.info("Pressione 'Q' para parar, 'R' para reiniciar linha")
+
+            # Worker de inferência
+            frames = queue.Queue(maxsize=INFER_BATCH)
+            stop_event = threading.Event()
+            self._result_lock = threading.Lock()
+            self._result_seq = 0
+            self._overlay_generation = 0
+            self._worker_error = None
+            self._reset_overlay(frames)
+
+            worker = threading.Thread(
+                target=self._inference_worker,
+                args=(frames, stop_event),
+                daemon=True
+            )
+            worker.start()
+
+            start_time = time.time()
+            frame_count = 0
+            handled_seq = 0
+
+            try:
+                while True:
+                    # Verificar tempo
+                    if time.time() - start_time > duration:
+                        logger.info("Tempo de monitoramento concluído")
+                        break
+
+                    # Capturar frame
+                    ret, frame = read_frame()
+                    if not ret:
+                        logger.error("Erro ao capturar frame")
+                        break
+
+                    frame_count += 1
+
+                    # Processar apenas em intervalos (economizar CPU) e só se a
+                    # cena mudou; senão o overlay mantém o último resultado.
+                    # Cópia: o frame exibido recebe o overlay enquanto o worker o lê
+                    if frame_count % (30 // FRAME_RATE) == 0 and self._frame_changed(frame):
+                        self._submit_latest(frames, frame.copy())
+
+                    if self._worker_error is not None:
+                        raise self._worker_error
+
+                    with self._result_lock:
+                        result, seq = self._last_result, self._result_seq
+
+                    # Exibir só a cada DISPLAY_EVERY frames (imshow é caro), mas
+                    # sempre o frame em que um alerta novo para a linha
+                    display = frame_count % DISPLAY_EVERY == 0
+                    alert = False
+
+                    if result is not None:
+                        has_foreign, class_name, confidence, result_frame = result
+
+                        # Textos do overlay refeitos só quando há resultado novo
+                        is_new = seq != handled_seq
+                        if is_new:
+                            if has_foreign:
+                                status_text = f"ALERTA: {class_name} ({confidence:.0%})"
+                            else:
+                                status_text = f"Operacao Normal - {class_name}"
+                            handled_seq = seq
+
+                        alert = is_new and has_foreign and self.line_running
+                        display = display or alert
+
+                        if display:
+                            # Se linha parada, não processar
+                            if not self.line_running:
+                                cv2.putText(frame, "LINHA PARADA - Pressione R para reiniciar",
+                                           (10, 30), OVERLAY_FONT, 0.7, (0, 0, 255), 2)
+                            elif has_foreign:
+                                cv2.putText(frame, status_text,
+                                           (10, 30), OVERLAY_FONT, 0.7, (0, 0, 255), 2)
+                                cv2.putText(frame, "PARANDO LINHA...",
+                                           (10, 60), OVERLAY_FONT, 0.7, (0, 0, 255), 2)
+                            else:
+                                cv2.putText(frame, status_text,
+                                           (10, 30), OVERLAY_FONT, 0.7, (0, 255, 0), 2)
+
+                    if display:
+                        # Mostrar estatísticas (texto atualizado junto com os contadores)
+                        cv2.putText(frame, self._stats_str,
+                                   (10, frame.shape[0] - 10), OVERLAY_FONT, 0.6, (255, 255, 255), 2)
+
+                        # Exibir frame
+                        cv2.imshow('Monitor de Esteira - Guardian EPI', frame)
+
+                    # Registrar e parar (uma vez por resultado novo)
+                    if alert:
+                        self.log_detection(result_frame, class_name, confidence)
+                        self.stop_production_line()
+
+                    # Teclas (lidas em todo frame, inclusive os não exibidos)
+                    key = cv2.waitKey(1) & 0xFF
+
+                    if key == ord('q') or key == ord('Q'):
+                        logger.info("Monitoramento interrompido pelo usuário")
+                        break
+
+                    if key == ord('r') or key == ord('R'):
+                        if not self.line_running:
+                            self.restart_production_line()
+                            self._reset_overlay(frames)
+
+            finally:
+                # Encerrar threads e liberar recursos
+                stop_event.set()
+                worker.join()
+                if grabber is not None:
+                    grabber.stop()
+                cap.release()
+                cv2.destroyAllWindows()
 
             # Resumo
             print("\n" + "="*70)
@@ -471,6 +1126,9 @@ class DetectorObjetosEstranhos:
         Gera relatório de qualidade do turno
         """
         try:
+            # Garante que as detecções do turno já estão em disco
+            self.flush()
+
             timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M")
             report_file = os.path.join(LOGS_DIR, f"relatorio_qualidade_{timestamp}.json")
 
@@ -485,8 +1143,14 @@ class DetectorObjetosEstranhos:
                 "status_linha": "EM OPERAÇÃO" if self.line_running else "PARADA"
             }
 
-            with open(report_file, 'w', encoding='utf-8') as f:
-                json.dump(report, f, indent=4, ensure_ascii=False)
+            # Relatório lido por supervisores: mantém a indentação, mas com o
+            # serializador em C quando disponível
+            if orjson is not None:
+                with open(report_file, 'wb') as f:
+                    f.write(orjson.dumps(report, option=orjson.OPT_INDENT_2))
+            else:
+                with open(report_file, 'w', encoding='utf-8') as f:
+                    json.dump(report, f, indent=2, ensure_ascii=False)
 
             logger.info(f"Relatório gerado: {report_file}")
             print(f"\n✓ Relatório salvo em: {report_file}")
@@ -510,9 +1174,6 @@ def main():
     print()
 
     try:
-        # Inicializar detector
-        detector = DetectorObjetosEstranhos()
-
         # Menu
         print("Selecione o modo de operação:")
         print("1 - Analisar uma imagem única")
@@ -524,12 +1185,16 @@ def main():
 
         if choice == '1':
             image_path = input("Digite o caminho da imagem: ").strip()
+            # Modelo carregado só se a imagem for válida
+            detector = DetectorObjetosEstranhos(lazy_model=True)
             detector.process_single_image(image_path)
 
         elif choice == '2':
             duration = input("Duração do monitoramento em segundos (padrão: 60): ").strip()
             duration = int(duration) if duration else 60
 
+            detector = DetectorObjetosEstranhos()
+
             print(f"\nIniciando monitoramento por {duration}s...")
             print("Pressione 'Q' para parar, 'R' para reiniciar linha se parada")
             time.sleep(2)
@@ -538,6 +1203,8 @@ def main():
             detector.generate_quality_report()
 
         elif choice == '3':
+            # Relatório não precisa do modelo (evita carregar o TensorFlow)
+            detector = DetectorObjetosEstranhos(lazy_model=True)
             detector.generate_quality_report()
 
         else:
@@ -6,10 +6,19 @@ Descrição: Sistema automatizado para detectar uso inadequado de EPIs na entrad
 """
 
 import os
+import platform
+
+# Threads do TensorFlow/oneDNN definidos antes de importá-lo: o runtime lê
+# estas variáveis ao criar seus pools, e o padrão subutiliza os núcleos em
+# inferências de lote 1. oneDNN habilita os kernels AVX2/AVX-512 de Conv2D.
+NUM_THREADS = os.cpu_count() or 1
+os.environ.setdefault("TF_ENABLE_ONEDNN_OPTS", "1")
+os.environ.setdefault("TF_NUM_INTRAOP_THREADS", str(NUM_THREADS))
+os.environ.setdefault("TF_NUM_INTEROP_THREADS", "2")
+
 import cv2
 import numpy as np
 from datetime import datetime
-from tensorflow import keras
 from PIL import Image
 import smtplib
 from email.mime.multipart import MIMEMultipart
@@ -17,6 +26,16 @@ from email.mime.text import MIMEText
 from email.mime.image import MIMEImage
 import logging
 import json
+import time
+import atexit
+import functools
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import numba  # Opcional: kernel compilado de normalização
+except ImportError:
+    numba = None
 
 # ==============================================================================
 # CONFIGURAÇÕES GLOBAIS
@@ -26,6 +45,20 @@ import json
 MODEL_PATH = "models/keras_model.h5"
 LABELS_PATH = "models/labels.txt"
 
+# O .h5 é convertido uma única vez para TFLite, salvo ao lado dele
+# (models/keras_model.tflite) e reconvertido apenas se o .h5 for mais novo.
+#
+# Quantização INT8 apenas em ARM: os kernels quantizados otimizados do TFLite
+# são escritos para NEON, e em x86 (AVX2) o INT8 chega a ser várias vezes mais
+# lento que o float32 com XNNPACK. Em x86 o modelo é mantido em float32.
+IS_ARM = platform.machine().lower() in ('aarch64', 'arm64', 'armv7l', 'armv8l')  # Mesmo teste do detector_objetos.py
+
+# Imagens representativas para a calibração INT8 (ARM)
+CALIBRATION_DIR = "test_images/epi"
+# Delegate XNNPACK externo (tflite-runtime/builds customizados); se não for
+# encontrado, o resolver BUILTIN do TFLite aplica o XNNPACK embutido.
+XNNPACK_DELEGATE_LIB = "libtensorflowlite_xnnpack_delegate.so"
+
 # Diretório para armazenar logs e imagens de ocorrências
 LOGS_DIR = "logs"
 
@@ -40,8 +73,30 @@ EMAIL_CONFIG = {
 
 # Configurações do modelo
 IMG_SIZE = 224  # Tamanho padrão do Teachable Machine
+PIXEL_SCALE = np.float32(1 / 255)  # Normalização para [0, 1]
 CONFIDENCE_THRESHOLD = 0.7  # Limiar de confiança para detecção
 
+# Extensões de imagem suportadas no processamento de diretórios
+VALID_EXTENSIONS = frozenset({'.jpg', '.jpeg', '.png', '.bmp'})
+
+# Imagens por inferência no processamento de diretórios
+BATCH_SIZE = 16
+
+# Qualidade JPEG das imagens de ocorrência (salvas e anexadas ao email)
+ALERT_JPEG_QUALITY = 85
+
+# Faixa de instruções do preview da webcam (texto em y=30)
+WEBCAM_BANNER_TEXT = "Pressione ESPACO para capturar, ESC para sair"
+WEBCAM_BANNER_HEIGHT = 40
+
+# Resolução de captura da webcam (o modelo usa 224x224)
+WEBCAM_WIDTH = 640
+WEBCAM_HEIGHT = 480
+
+# Leitura/decodificação antecipada de imagens enquanto o modelo executa
+PREFETCH_WORKERS = 2
+PREFETCH_IMAGES = 4
+
 # ==============================================================================
 # CONFIGURAÇÃO DE LOGGING
 # ==============================================================================
@@ -53,6 +108,62 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+# ==============================================================================
+# COMPATIBILIDADE KERAS
+# ==============================================================================
+
+@functools.lru_cache(maxsize=None)
+def _depthwise_conv2d_fixed():
+    """
+    DepthwiseConv2D que ignora o parâmetro 'groups' (TensorFlow 2.20+)
+
+    Criada sob demanda e uma única vez: o TensorFlow só é importado quando
+    um modelo Keras é carregado.
+
+    Returns:
+        Subclasse de keras.layers.DepthwiseConv2D
+    """
+    from tensorflow import keras
+
+    class DepthwiseConv2DFixed(keras.layers.DepthwiseConv2D):
+        def __init__(self, *args, **kwargs):
+            # Remove o parâmetro 'groups' se existir
+            kwargs.pop('groups', None)
+            super().__init__(*args, **kwargs)
+
+    return DepthwiseConv2DFixed
+
+
+# ==============================================================================
+# KERNEL DE PRÉ-PROCESSAMENTO
+# ==============================================================================
+
+def _bgr_to_rgb_norm_numpy(src, dst):
+    """
+    BGR uint8 -> RGB float32 em [0, 1], escrito em dst (NumPy)
+    """
+    np.multiply(src[..., ::-1], PIXEL_SCALE, out=dst, dtype=np.float32)
+
+
+if numba is not None:
+    @numba.njit(cache=True, fastmath=True)
+    def _bgr_to_rgb_norm(src, dst):
+        """
+        BGR uint8 -> RGB float32 em [0, 1], escrito em dst (Numba)
+
+        Troca de canais e normalização em um único laço vetorizado, sem o
+        despacho do NumPy a cada frame. Sem parallel: a inferência e a
+        leitura antecipada já ocupam os núcleos.
+        """
+        scale = np.float32(1 / 255)
+        for i in range(src.shape[0]):
+            for j in range(src.shape[1]):
+                for c in range(3):
+                    dst[i, j, c] = src[i, j, 2 - c] * scale
+else:
+    _bgr_to_rgb_norm = _bgr_to_rgb_norm_numpy
+
+
 # ==============================================================================
 # CLASSE PRINCIPAL - MONITOR EPI
 # ==============================================================================
@@ -68,6 +179,15 @@ class MonitorEPI:
     - Sistema de alertas
     """
 
+    # Modelos já carregados, por (model_path, labels_path): novas instâncias
+    # reutilizam o runtime em vez de recarregar e reaquecer o modelo. As
+    # instâncias compartilham o interpretador e não devem inferir em
+    # paralelo.
+    _model_cache = {}
+
+    # Atributos do modelo carregado que vão para o cache
+    _MODEL_ATTRS = ('model', 'interpreter', 'backend', 'labels', '_tflite_io', '_infer')
+
     def __init__(self, model_path=MODEL_PATH, labels_path=LABELS_PATH):
         """
         Inicializa o monitor de EPIs
@@ -77,16 +197,63 @@ class MonitorEPI:
             labels_path: Caminho para o arquivo labels.txt
         """
         self.model = None
+        self.interpreter = None
+        self.backend = None  # 'tflite', 'saved_model' ou 'keras'
         self.labels = []
         self.model_path = model_path
+        self._last_alert_bytes = None  # JPEG da última ocorrência salva
+        self.alerts_count = 0  # Numera as imagens de ocorrência
+
+        # Faixa de instruções da webcam, renderizada uma vez por largura de frame
+        self._banner_overlay = None
+        self._banner_mask = None
+
+        # Buffers de pré-processamento reutilizados a cada imagem/frame
+        self._resize_buf = np.empty((IMG_SIZE, IMG_SIZE, 3), dtype=np.uint8)
+        self._input_buf = np.empty((1, IMG_SIZE, IMG_SIZE, 3), dtype=np.float32)
+
+        # INT8 só em ARM e com imagens de calibração disponíveis
+        self.calibration_dir = CALIBRATION_DIR if IS_ARM and os.path.isdir(CALIBRATION_DIR) else None
+        self.tflite_path = os.path.splitext(model_path)[0] + ("_int8.tflite" if self.calibration_dir else ".tflite")
+        # Fallback quando a conversão para TFLite falha: SavedModel com a
+        # função de inferência já traçada (dispensa o parser do .h5)
+        self.saved_model_path = os.path.splitext(model_path)[0] + "_saved_model"
         self.labels_path = labels_path
 
         # Criar diretório de logs se não existir
         os.makedirs(LOGS_DIR, exist_ok=True)
 
-        # Carregar modelo e rótulos
-        self._load_model()
-        self._load_labels()
+        # Log de ocorrências aberto uma única vez (com buffer de linha)
+        self._log_fh = open(
+            os.path.join(LOGS_DIR, "ocorrencias_epi.log"), 'a',
+            buffering=1, encoding='utf-8'
+        )
+
+        # Emails enviados em segundo plano (SMTP + STARTTLS + login levam
+        # segundos e congelariam a webcam); emails pendentes são
+        # concluídos ao encerrar o programa
+        self._alert_executor = ThreadPoolExecutor(max_workers=1)
+        atexit.register(self.close)
+
+        # Conexão SMTP mantida entre alertas (STARTTLS + login uma única vez);
+        # usada apenas pela thread de emails
+        self._smtp = None
+
+        # Carregar modelo e rótulos (uma vez por modelo no processo)
+        cache_key = (model_path, labels_path)
+        cached = MonitorEPI._model_cache.get(cache_key)
+
+        if cached is not None:
+            self.__dict__.update(cached)
+            logger.info(f"Modelo reutilizado do cache: {model_path}")
+        else:
+            self._load_model()
+            self._warmup_model()
+            self._load_labels()
+
+            MonitorEPI._model_cache[cache_key] = {
+                name: getattr(self, name) for name in self._MODEL_ATTRS if hasattr(self, name)
+            }
 
         logger.info("Monitor EPI inicializado com sucesso")
 
@@ -103,36 +270,212 @@ class MonitorEPI:
             if not os.path.exists(self.model_path):
                 raise FileNotFoundError(f"Modelo não encontrado em: {self.model_path}")
 
-            # Fix para compatibilidade com TensorFlow 2.20+
-            # Remove o parâmetro 'groups' do DepthwiseConv2D
-            import tensorflow as tf
-
-            # Carrega o modelo com custom object
-            with tf.keras.utils.custom_object_scope({}):
-                # Cria uma classe wrapper para DepthwiseConv2D que ignora 'groups'
-                original_depthwise = tf.keras.layers.DepthwiseConv2D
-
-                class DepthwiseConv2DFixed(original_depthwise):
-                    def __init__(self, *args, **kwargs):
-                        # Remove o parâmetro 'groups' se existir
-                        kwargs.pop('groups', None)
-                        super().__init__(*args, **kwargs)
+            # Inferência via TFLite + XNNPACK; o Keras só é carregado para
+            # (re)gerar o cache ou se a conversão falhar
+            if self._cache_valid(self.tflite_path):
+                self._load_tflite_model()
+                return
 
-                # Substitui temporariamente
-                tf.keras.layers.DepthwiseConv2D = DepthwiseConv2DFixed
+            if self._cache_valid(os.path.join(self.saved_model_path, "saved_model.pb")):
+                self._load_saved_model()
+                return
 
-                try:
-                    self.model = keras.models.load_model(self.model_path, compile=False)
-                finally:
-                    # Restaura a classe original
-                    tf.keras.layers.DepthwiseConv2D = original_depthwise
+            self._load_keras_model()
 
-            logger.info(f"Modelo carregado: {self.model_path}")
+            try:
+                from converter_modelo import convert_to_tflite
+
+                if IS_ARM and self.calibration_dir is None:
+                    logger.warning(f"Sem imagens de calibração em {CALIBRATION_DIR}, convertendo em float32")
+
+                convert_to_tflite(
+                    self.model,
+                    self.tflite_path,
+                    calibration_dir=self.calibration_dir,
+                    img_size=IMG_SIZE
+                )
+                self._load_tflite_model()
+                self.model = None  # libera o modelo Keras
+            except Exception as e:
+                logger.warning(f"Conversão para TFLite falhou, usando Keras: {e}")
+                self._trace_keras_model()
+                self._save_saved_model()
 
         except Exception as e:
             logger.error(f"Erro ao carregar modelo: {e}")
             raise
 
+    def _cache_valid(self, cache_path):
+        """
+        Verifica se o modelo convertido existe e não é mais antigo que o .h5
+        """
+        return (
+            os.path.exists(cache_path)
+            and os.path.getmtime(cache_path) >= os.path.getmtime(self.model_path)
+        )
+
+    def _load_keras_model(self):
+        """
+        Carrega o modelo .h5 no runtime Keras
+        """
+        # Import tardio: o TensorFlow só é inicializado ao carregar o modelo
+        from tensorflow import keras
+
+        # Fix para compatibilidade com TensorFlow 2.20+: a camada corrigida é
+        # passada via custom_objects, sem trocar a classe global do Keras
+        self.model = keras.models.load_model(
+            self.model_path,
+            compile=False,
+            custom_objects={'DepthwiseConv2D': _depthwise_conv2d_fixed()}
+        )
+
+        self.backend = 'keras'
+        logger.info(f"Modelo carregado: {self.model_path}")
+
+    def _trace_keras_model(self):
+        """
+        Traça o modelo Keras uma única vez como grafo (fallback sem TFLite)
+
+        Evita o overhead de model.predict (loop de lotes, barra de progresso,
+        callbacks) a cada imagem.
+        """
+        import tensorflow as tf
+
+        self._serving_fn = tf.function(
+            lambda input: self.model(input, training=False),
+            input_signature=[tf.TensorSpec([None, IMG_SIZE, IMG_SIZE, 3], tf.float32, name='input')]
+        )
+        infer = self._serving_fn.get_concrete_function()
+
+        self._infer = lambda batch: infer(tf.constant(batch)).numpy()
+
+    def _save_saved_model(self):
+        """
+        Exporta o grafo traçado como SavedModel para as próximas execuções
+        """
+        import tensorflow as tf
+
+        try:
+            module = tf.Module()
+            module.model = self.model
+            tf.saved_model.save(
+                module,
+                self.saved_model_path,
+                signatures={'serving_default': self._serving_fn.get_concrete_function()}
+            )
+            logger.info(f"SavedModel salvo: {self.saved_model_path}")
+        except Exception as e:
+            logger.warning(f"Não foi possível salvar o SavedModel: {e}")
+
+    def _load_saved_model(self):
+        """
+        Carrega o SavedModel exportado e usa sua assinatura serving_default
+        """
+        import tensorflow as tf
+
+        self.model = tf.saved_model.load(self.saved_model_path)
+        infer = self.model.signatures['serving_default']
+
+        # A assinatura devolve um dicionário com uma única saída
+        self._infer = lambda batch: next(iter(infer(input=tf.constant(batch)).values())).numpy()
+
+        self.backend = 'saved_model'
+        logger.info(f"SavedModel carregado: {self.saved_model_path}")
+
+    def _load_tflite_model(self):
+        """
+        Carrega o modelo TFLite e aloca os tensores uma única vez
+
+        Os kernels de Conv/DepthwiseConv rodam via XNNPACK (AVX2/NEON).
+        """
+        import tensorflow as tf
+
+        resolver = tf.lite.experimental.OpResolverType
+        try:
+            delegates = [tf.lite.experimental.load_delegate(XNNPACK_DELEGATE_LIB)]
+            # Evita aplicar o XNNPACK embutido por cima do delegate externo
+            op_resolver = resolver.BUILTIN_WITHOUT_DEFAULT_DELEGATES
+            logger.info(f"Delegate XNNPACK carregado: {XNNPACK_DELEGATE_LIB}")
+        except (ValueError, OSError):
+            delegates = None
+            op_resolver = resolver.BUILTIN
+            logger.info("Usando XNNPACK embutido do TFLite")
+
+        self.interpreter = tf.lite.Interpreter(
+            model_path=self.tflite_path,
+            num_threads=NUM_THREADS,
+            experimental_delegates=delegates,
+            experimental_op_resolver_type=op_resolver
+        )
+        self.interpreter.allocate_tensors()
+
+        # Detalhes de E/S num dicionário mutável: instâncias que compartilham
+        # o interpretador (cache de modelos) enxergam o mesmo redimensionamento
+        self._tflite_io = {
+            'input': self.interpreter.get_input_details()[0],
+            'output': self.interpreter.get_output_details()[0],
+        }
+        self.backend = 'tflite'
+
+        logger.info(f"Modelo TFLite carregado: {self.tflite_path}")
+
+    def _warmup_model(self):
+        """
+        Executa uma inferência com entrada nula logo após o carregamento
+
+        A primeira chamada aloca os kernels e os buffers do modelo (e
+        compila o kernel Numba, se houver); assim esse custo não cai sobre
+        a primeira captura da webcam.
+        """
+        try:
+            start = time.perf_counter()
+            _bgr_to_rgb_norm(self._resize_buf, self._input_buf[0])
+            self._run_inference(np.zeros((1, IMG_SIZE, IMG_SIZE, 3), dtype=np.float32))
+            logger.info(f"Aquecimento do modelo: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        except Exception as e:
+            logger.warning(f"Falha no aquecimento do modelo: {e}")
+
+    def _run_inference(self, batch):
+        """
+        Executa o modelo carregado sobre um lote pré-processado
+
+        Args:
+            batch: Array float32 (N, IMG_SIZE, IMG_SIZE, 3) normalizado em [0, 1]
+
+        Returns:
+            Array float32 (N, num_classes) com as probabilidades
+        """
+        if self.backend in ('keras', 'saved_model'):
+            return self._infer(batch)
+
+        io = self._tflite_io
+        if io['input']['shape'][0] != len(batch):
+            # Redimensionar o tensor de entrada para o tamanho do lote
+            self.interpreter.resize_tensor_input(io['input']['index'], batch.shape)
+            self.interpreter.allocate_tensors()
+            io['input'] = self.interpreter.get_input_details()[0]
+            io['output'] = self.interpreter.get_output_details()[0]
+
+        input_details = io['input']
+        if input_details['dtype'] != np.float32:
+            # Quantizar entrada com a escala/zero-point do modelo INT8
+            scale, zero_point = input_details['quantization']
+            info = np.iinfo(input_details['dtype'])
+            batch = np.clip(np.rint(batch / scale + zero_point), info.min, info.max)
+            batch = batch.astype(input_details['dtype'])
+
+        self.interpreter.set_tensor(input_details['index'], batch)
+        self.interpreter.invoke()
+        predictions = self.interpreter.get_tensor(io['output']['index'])
+
+        if predictions.dtype != np.float32:
+            # Dequantizar a saída para probabilidades
+            scale, zero_point = io['output']['quantization']
+            predictions = (predictions.astype(np.float32) - zero_point) * scale
+
+        return predictions
+
     def _load_labels(self):
         """
         Carrega os rótulos das classes do modelo
@@ -150,30 +493,35 @@ class MonitorEPI:
             logger.error(f"Erro ao carregar rótulos: {e}")
             raise
 
-    def preprocess_image(self, image):
+    def preprocess_image(self, image, out=None):
         """
         Pré-processa a imagem para o formato esperado pelo modelo
 
+        Escreve nos buffers pré-alocados (nenhuma alocação por imagem); o
+        array retornado é reescrito na próxima chamada.
+
         Args:
             image: Imagem em formato numpy array (BGR do OpenCV)
+            out: Destino float32 (IMG_SIZE, IMG_SIZE, 3), p.ex. uma linha de
+                um lote (padrão: buffer de entrada interno)
 
         Returns:
-            numpy array normalizado e redimensionado
+            numpy array (1, IMG_SIZE, IMG_SIZE, 3) normalizado e redimensionado
         """
         try:
-            # Converter BGR para RGB (OpenCV usa BGR, modelo espera RGB)
-            image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-
-            # Redimensionar para o tamanho esperado pelo modelo
-            image_resized = cv2.resize(image_rgb, (IMG_SIZE, IMG_SIZE))
+            if out is None:
+                out = self._input_buf[0]
 
-            # Normalizar pixels para range [0, 1]
-            image_normalized = image_resized.astype(np.float32) / 255.0
+            # Redimensionar primeiro: as etapas seguintes tocam só IMG_SIZE x IMG_SIZE
+            # (INTER_AREA: filtro de caixa, sem aliasing na redução)
+            cv2.resize(image, (IMG_SIZE, IMG_SIZE), dst=self._resize_buf,
+                       interpolation=cv2.INTER_AREA)
 
-            # Adicionar dimensão de batch
-            image_batch = np.expand_dims(image_normalized, axis=0)
+            # BGR para RGB + normalizar para [0, 1] em uma passada
+            _bgr_to_rgb_norm(self._resize_buf, out)
 
-            return image_batch
+            # Adicionar dimensão de batch (view, sem cópia)
+            return out[np.newaxis]
 
         except Exception as e:
             logger.error(f"Erro no pré-processamento: {e}")
@@ -194,7 +542,7 @@ class MonitorEPI:
             processed_image = self.preprocess_image(image)
 
             # Realizar predição
-            predictions = self.model.predict(processed_image, verbose=0)
+            predictions = self._run_inference(processed_image)
 
             # Obter índice da classe com maior probabilidade
             class_index = np.argmax(predictions[0])
@@ -220,11 +568,8 @@ class MonitorEPI:
             image_path: Caminho da imagem salva
         """
         try:
-            log_file = os.path.join(LOGS_DIR, "ocorrencias_epi.log")
-
-            with open(log_file, 'a', encoding='utf-8') as f:
-                log_message = f"[{timestamp}] - ALERTA: Funcionário sem EPI detectado. Imagem: {image_path}\n"
-                f.write(log_message)
+            log_message = f"[{timestamp}] - ALERTA: Funcionário sem EPI detectado. Imagem: {image_path}\n"
+            self._log_fh.write(log_message)
 
             logger.info(f"Log criado: {log_message.strip()}")
 
@@ -244,11 +589,19 @@ class MonitorEPI:
             Caminho completo da imagem salva
         """
         try:
-            filename = f"imagem_ocorrencia_{timestamp}.jpg"
+            # Numerada: lotes geram várias ocorrências no mesmo segundo
+            self.alerts_count += 1
+            filename = f"imagem_ocorrencia_{timestamp}_{self.alerts_count:04d}.jpg"
             image_path = os.path.join(LOGS_DIR, filename)
 
-            # Salvar imagem
-            cv2.imwrite(image_path, image)
+            # Codificar uma única vez: os mesmos bytes vão para o disco e
+            # para o anexo do email, sem reler o arquivo
+            ok, buffer = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, ALERT_JPEG_QUALITY])
+            if not ok:
+                raise ValueError("Falha ao codificar imagem de alerta")
+
+            buffer.tofile(image_path)
+            self._last_alert_bytes = buffer.tobytes()
 
             logger.info(f"Imagem de alerta salva: {image_path}")
 
@@ -258,13 +611,14 @@ class MonitorEPI:
             logger.error(f"Erro ao salvar imagem: {e}")
             raise
 
-    def send_email_alert(self, timestamp, image_path):
+    def send_email_alert(self, timestamp, image_path, image_bytes=None):
         """
         Envia email de alerta para o supervisor
 
         Args:
             timestamp: String com timestamp formatado
             image_path: Caminho da imagem a ser anexada
+            image_bytes: JPEG já codificado da imagem (evita reler o arquivo)
         """
         try:
             # Criar mensagem
@@ -284,17 +638,21 @@ class MonitorEPI:
             msg.attach(MIMEText(body, 'plain', 'utf-8'))
 
             # Anexar imagem
-            if os.path.exists(image_path):
+            if image_bytes is None and os.path.exists(image_path):
                 with open(image_path, 'rb') as f:
-                    img_data = f.read()
-                    image = MIMEImage(img_data, name=os.path.basename(image_path))
-                    msg.attach(image)
+                    image_bytes = f.read()
 
-            # Enviar email
-            with smtplib.SMTP(EMAIL_CONFIG['smtp_server'], EMAIL_CONFIG['smtp_port']) as server:
-                server.starttls()
-                server.login(EMAIL_CONFIG['sender_email'], EMAIL_CONFIG['sender_password'])
-                server.send_message(msg)
+            if image_bytes is not None:
+                image = MIMEImage(image_bytes, name=os.path.basename(image_path))
+                msg.attach(image)
+
+            # Enviar email pela conexão persistente; se o servidor a tiver
+            # encerrado durante o envio, reconecta e tenta uma vez mais
+            try:
+                self._ensure_smtp().send_message(msg)
+            except smtplib.SMTPServerDisconnected:
+                self._smtp = None
+                self._ensure_smtp().send_message(msg)
 
             logger.info(f"Email enviado para: {EMAIL_CONFIG['recipient_email']}")
 
@@ -302,6 +660,48 @@ class MonitorEPI:
             logger.error(f"Erro ao enviar email: {e}")
             logger.warning("Sistema continuará funcionando, mas notificação por email falhou")
 
+    def _ensure_smtp(self):
+        """
+        Retorna a conexão SMTP autenticada, (re)conectando se necessário
+
+        A conexão existente é validada com NOOP; servidores costumam
+        encerrar conexões ociosas entre alertas.
+
+        Returns:
+            smtplib.SMTP pronto para envio
+        """
+        if self._smtp is not None:
+            try:
+                if self._smtp.noop()[0] == 250:
+                    return self._smtp
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._close_smtp()
+
+        server = smtplib.SMTP(EMAIL_CONFIG['smtp_server'], EMAIL_CONFIG['smtp_port'])
+        try:
+            server.starttls()
+            server.login(EMAIL_CONFIG['sender_email'], EMAIL_CONFIG['sender_password'])
+        except Exception:
+            server.close()
+            raise
+
+        self._smtp = server
+        return server
+
+    def _close_smtp(self):
+        """
+        Encerra a conexão SMTP persistente, se houver
+        """
+        if self._smtp is None:
+            return
+
+        try:
+            self._smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            self._smtp.close()
+        self._smtp = None
+
     def trigger_alert(self, image):
         """
         Aciona sequência completa de alerta
@@ -319,11 +719,9 @@ class MonitorEPI:
             # Criar entrada no log
             self.create_log_entry(timestamp, image_path)
 
-            # Enviar email (com tratamento de erro para não bloquear o sistema)
-            try:
-                self.send_email_alert(timestamp, image_path)
-            except Exception as email_error:
-                logger.warning(f"Falha no envio de email: {email_error}")
+            # Enviar email em segundo plano (falhas são registradas em
+            # send_email_alert e não bloqueiam o sistema)
+            self._alert_executor.submit(self.send_email_alert, timestamp, image_path, self._last_alert_bytes)
 
             logger.warning("ALERTA: Funcionário sem EPI detectado!")
 
@@ -331,6 +729,40 @@ class MonitorEPI:
             logger.error(f"Erro na sequência de alerta: {e}")
             raise
 
+    def close(self):
+        """
+        Aguarda o envio dos emails de alerta pendentes e fecha o log e a
+        conexão SMTP
+        """
+        self._alert_executor.shutdown(wait=True)
+        self._close_smtp()
+        if not self._log_fh.closed:
+            self._log_fh.close()
+
+    def _read_image(self, image_path):
+        """
+        Lê e decodifica uma imagem do disco
+
+        Lê os bytes com np.fromfile e decodifica com cv2.imdecode: a
+        ausência do arquivo é detectada na própria abertura, sem um
+        os.path.exists antes.
+
+        Args:
+            image_path: Caminho do arquivo de imagem
+
+        Returns:
+            Imagem BGR, ou None se o arquivo não puder ser decodificado
+        """
+        try:
+            buffer = np.fromfile(image_path, dtype=np.uint8)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Imagem não encontrada: {image_path}") from None
+
+        if buffer.size == 0:
+            return None
+
+        return cv2.imdecode(buffer, cv2.IMREAD_COLOR)
+
     def process_image_file(self, image_path):
         """
         Processa uma imagem de arquivo
@@ -339,11 +771,8 @@ class MonitorEPI:
             image_path: Caminho do arquivo de imagem
         """
         try:
-            if not os.path.exists(image_path):
-                raise FileNotFoundError(f"Imagem não encontrada: {image_path}")
-
             # Carregar imagem
-            image = cv2.imread(image_path)
+            image = self._read_image(image_path)
 
             if image is None:
                 raise ValueError(f"Não foi possível carregar a imagem: {image_path}")
@@ -353,52 +782,173 @@ class MonitorEPI:
             # Realizar predição
             class_name, confidence = self.predict(image)
 
-            # Verificar se é sem EPI e confiança é suficiente
-            if 'sem_epi' in class_name.lower() and confidence >= CONFIDENCE_THRESHOLD:
-                logger.warning(f"⚠️ Detectado: {class_name} (confiança: {confidence:.2%})")
-                self.trigger_alert(image)
-            else:
-                logger.info(f"✓ EPI adequado detectado (classe: {class_name}, confiança: {confidence:.2%})")
+            self._check_result(image, class_name, confidence)
 
         except Exception as e:
             logger.error(f"Erro ao processar imagem: {e}")
             raise
 
+    def _check_result(self, image, class_name, confidence):
+        """
+        Aciona o alerta se a predição indicar ausência de EPI
+
+        Args:
+            image: Imagem avaliada
+            class_name: Classe predita
+            confidence: Confiança da predição
+        """
+        # Verificar se é sem EPI e confiança é suficiente
+        if 'sem_epi' in class_name.lower() and confidence >= CONFIDENCE_THRESHOLD:
+            logger.warning(f"⚠️ Detectado: {class_name} (confiança: {confidence:.2%})")
+            self.trigger_alert(image)
+        else:
+            logger.info(f"✓ EPI adequado detectado (classe: {class_name}, confiança: {confidence:.2%})")
+
+    def _list_images(self, directory_path):
+        """
+        Lista os caminhos das imagens suportadas em um diretório
+
+        Args:
+            directory_path: Caminho do diretório com imagens
+
+        Returns:
+            Lista de caminhos de imagem
+        """
+        if not os.path.exists(directory_path):
+            raise FileNotFoundError(f"Diretório não encontrado: {directory_path}")
+
+        # Listar arquivos de imagem (scandir: nome e tipo na mesma chamada)
+        with os.scandir(directory_path) as entries:
+            return [
+                entry.path for entry in entries
+                if os.path.splitext(entry.name)[1].lower() in VALID_EXTENSIONS
+                and entry.is_file()
+            ]
+
+    def _prefetch_images(self, image_paths):
+        """
+        Lê e decodifica as imagens em threads, à frente da inferência
+
+        A leitura/decodificação e a inferência liberam o GIL, então a E/S de disco e a
+        decodificação JPEG se sobrepõem ao modelo. O pré-processamento fica
+        na thread principal, pois usa os buffers compartilhados.
+
+        Args:
+            image_paths: Caminhos das imagens, na ordem de processamento
+
+        Yields:
+            Tuplas (caminho, imagem BGR ou None se ilegível)
+        """
+        executor = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS)
+        pending = deque()
+        paths = iter(image_paths)
+
+        try:
+            for image_path in paths:
+                pending.append((image_path, executor.submit(self._read_image, image_path)))
+                if len(pending) >= PREFETCH_IMAGES:
+                    break
+
+            while pending:
+                image_path, future = pending.popleft()
+
+                # Repõe a fila antes de entregar a imagem atual
+                next_path = next(paths, None)
+                if next_path is not None:
+                    pending.append((next_path, executor.submit(self._read_image, next_path)))
+
+                yield image_path, future.result()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
     def process_directory(self, directory_path):
         """
         Processa todas as imagens em um diretório
 
+        Mesmo fluxo do processamento em lotes (imagens ilegíveis são
+        registradas e ignoradas), uma imagem por inferência.
+
         Args:
             directory_path: Caminho do diretório com imagens
         """
-        try:
-            if not os.path.exists(directory_path):
-                raise FileNotFoundError(f"Diretório não encontrado: {directory_path}")
+        self.process_directory_batched(directory_path, batch_size=1)
 
-            # Extensões de imagem suportadas
-            valid_extensions = ['.jpg', '.jpeg', '.png', '.bmp']
+    def process_directory_batched(self, directory_path, batch_size=BATCH_SIZE):
+        """
+        Processa todas as imagens de um diretório em lotes
 
-            # Listar arquivos de imagem
-            image_files = [
-                f for f in os.listdir(directory_path)
-                if os.path.splitext(f)[1].lower() in valid_extensions
-            ]
+        Uma única inferência por lote de até batch_size imagens, em vez de
+        uma chamada ao modelo por imagem.
+
+        Args:
+            directory_path: Caminho do diretório com imagens
+            batch_size: Número de imagens por inferência
+        """
+        try:
+            image_paths = self._list_images(directory_path)
 
-            if not image_files:
+            if not image_paths:
                 logger.warning(f"Nenhuma imagem encontrada em: {directory_path}")
                 return
 
-            logger.info(f"Encontradas {len(image_files)} imagens para processar")
+            logger.info(f"Encontradas {len(image_paths)} imagens para processar (lotes de {batch_size})")
+
+            # Lote alocado uma única vez e preenchido por atribuição de fatia
+            batch = np.empty((batch_size, IMG_SIZE, IMG_SIZE, 3), dtype=np.float32)
+
+            prefetched = self._prefetch_images(image_paths)
+
+            for start in range(0, len(image_paths), batch_size):
+                images = []
+                for _ in range(min(batch_size, len(image_paths) - start)):
+                    image_path, image = next(prefetched)
+                    if image is None:
+                        logger.error(f"Não foi possível carregar a imagem: {image_path}")
+                        continue
+
+                    self.preprocess_image(image, out=batch[len(images)])
+                    images.append((image_path, image))
+
+                if not images:
+                    continue
+
+                predictions = self._run_inference(batch[:len(images)])
+
+                class_indices = np.argmax(predictions, axis=1)
+                confidences = predictions[np.arange(len(images)), class_indices]
+
+                for (image_path, image), class_index, confidence in zip(images, class_indices, confidences):
+                    class_name = self.labels[class_index] if class_index < len(self.labels) else "unknown"
 
-            # Processar cada imagem
-            for image_file in image_files:
-                image_path = os.path.join(directory_path, image_file)
-                self.process_image_file(image_path)
+                    logger.info(f"Processando imagem: {image_path}")
+                    self._check_result(image, class_name, confidence)
 
         except Exception as e:
             logger.error(f"Erro ao processar diretório: {e}")
             raise
 
+    def _draw_banner(self, frame):
+        """
+        Aplica a faixa de instruções pré-renderizada ao frame
+
+        O texto é rasterizado uma única vez; a cada frame só os pixels do
+        texto são copiados para o topo do frame.
+
+        Args:
+            frame: Frame BGR da webcam (modificado in-place)
+        """
+        width = frame.shape[1]
+
+        if self._banner_overlay is None or self._banner_overlay.shape[1] != width:
+            overlay = np.zeros((WEBCAM_BANNER_HEIGHT, width, 3), dtype=np.uint8)
+            cv2.putText(overlay, WEBCAM_BANNER_TEXT,
+                       (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+
+            self._banner_overlay = overlay
+            self._banner_mask = overlay.any(axis=2, keepdims=True)
+
+        np.copyto(frame[:WEBCAM_BANNER_HEIGHT], self._banner_overlay, where=self._banner_mask)
+
     def capture_from_webcam(self):
         """
         MÉTODO EXTRA: Captura imagem em tempo real da webcam e processa
@@ -412,6 +962,13 @@ class MonitorEPI:
             if not cap.isOpened():
                 raise RuntimeError("Não foi possível abrir a webcam")
 
+            # MJPG em 640x480: bem menos banda USB que YUYV na resolução
+            # nativa; buffer de 1 frame evita capturar frames atrasados
+            cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, WEBCAM_WIDTH)
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, WEBCAM_HEIGHT)
+            cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
             logger.info("Webcam ativada. Pressione ESPAÇO para capturar, ESC para sair")
 
             while True:
@@ -423,8 +980,7 @@ class MonitorEPI:
                     break
 
                 # Mostrar preview
-                cv2.putText(frame, "Pressione ESPACO para capturar, ESC para sair",
-                           (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+                self._draw_banner(frame)
                 cv2.imshow('Guardian EPI - Webcam', frame)
 
                 # Aguardar tecla
@@ -484,10 +1040,7 @@ def main():
     print()
 
     try:
-        # Inicializar monitor
-        monitor = MonitorEPI()
-
-        # Menu de opções
+        # Menu de opções (exibido antes de carregar o TensorFlow e o modelo)
         print("Selecione o modo de operação:")
         print("1 - Processar imagens de um diretório")
         print("2 - Processar uma única imagem")
@@ -498,14 +1051,17 @@ def main():
 
         if choice == '1':
             directory = input("Digite o caminho do diretório com imagens: ").strip()
-            monitor.process_directory(directory)
+            monitor = MonitorEPI()
+            monitor.process_directory_batched(directory)
 
         elif choice == '2':
             image_path = input("Digite o caminho da imagem: ").strip()
+            monitor = MonitorEPI()
             monitor.process_image_file(image_path)
 
         elif choice == '3':
             print("\nIniciando modo webcam...")
+            monitor = MonitorEPI()
             monitor.capture_from_webcam()
 
         else:
@@ -5,16 +5,26 @@ Processa amostras de ambas as categorias e gera relatório
 """
 import os
 import sys
+
+# Threads do TensorFlow/oneDNN definidos antes de importá-lo (mesma
+# configuração do monitor_epi.py)
+NUM_THREADS = os.cpu_count() or 1
+os.environ.setdefault("TF_ENABLE_ONEDNN_OPTS", "1")
+os.environ.setdefault("TF_NUM_INTRAOP_THREADS", str(NUM_THREADS))
+os.environ.setdefault("TF_NUM_INTEROP_THREADS", "2")
+
 import cv2
 import numpy as np
-from tensorflow import keras
 from datetime import datetime
 
 # Configurações
 MODEL_PATH = "models/keras_model.h5"
+TFLITE_PATH = os.path.splitext(MODEL_PATH)[0] + ".tflite"  # Mesmo cache do monitor_epi.py
 LABELS_PATH = "models/labels.txt"
+XNNPACK_DELEGATE_LIB = "libtensorflowlite_xnnpack_delegate.so"
 IMG_SIZE = 224
 CONFIDENCE_THRESHOLD = 0.7
+BATCH_SIZE = 16  # Imagens por inferência
 
 # Diretórios de teste
 TEST_DIR_COM_EPI = "test_images/epi/com_epi"
@@ -28,10 +38,34 @@ print()
 # Carregar modelo
 print("[1/3] Carregando modelo...")
 try:
-    modelo = keras.models.load_model(MODEL_PATH, compile=False)
-    print(f"   ✅ Modelo carregado: {MODEL_PATH}")
-    print(f"   📊 Input shape: {modelo.input_shape}")
-    print(f"   📊 Output shape: {modelo.output_shape}")
+    import tensorflow as tf
+
+    # Converte o .h5 para TFLite uma única vez (reconverte se o .h5 for mais novo)
+    if not os.path.exists(TFLITE_PATH) or os.path.getmtime(TFLITE_PATH) < os.path.getmtime(MODEL_PATH):
+        from converter_modelo import load_keras_model, convert_to_tflite
+        convert_to_tflite(load_keras_model(MODEL_PATH), TFLITE_PATH, img_size=IMG_SIZE)
+
+    try:
+        delegates = [tf.lite.experimental.load_delegate(XNNPACK_DELEGATE_LIB)]
+        op_resolver = tf.lite.experimental.OpResolverType.BUILTIN_WITHOUT_DEFAULT_DELEGATES
+    except (ValueError, OSError):
+        # XNNPACK embutido do resolver padrão
+        delegates = None
+        op_resolver = tf.lite.experimental.OpResolverType.BUILTIN
+
+    interpreter = tf.lite.Interpreter(
+        model_path=TFLITE_PATH,
+        num_threads=NUM_THREADS,
+        experimental_delegates=delegates,
+        experimental_op_resolver_type=op_resolver
+    )
+    interpreter.allocate_tensors()
+    input_details = interpreter.get_input_details()[0]
+    output_details = interpreter.get_output_details()[0]
+
+    print(f"   ✅ Modelo carregado: {TFLITE_PATH}")
+    print(f"   📊 Input shape: {tuple(input_details['shape'])}")
+    print(f"   📊 Output shape: {tuple(output_details['shape'])}")
 except Exception as e:
     print(f"   ❌ Erro ao carregar modelo: {e}")
     sys.exit(1)
@@ -46,30 +80,78 @@ except Exception as e:
     print(f"   ❌ Erro ao carregar labels: {e}")
     sys.exit(1)
 
-# Função de pré-processamento
-def preprocess_image(image):
-    """Pré-processa imagem para o modelo"""
-    image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-    image_resized = cv2.resize(image_rgb, (IMG_SIZE, IMG_SIZE))
-    image_normalized = image_resized.astype(np.float32) / 255.0
-    image_batch = np.expand_dims(image_normalized, axis=0)
-    return image_batch
-
-# Função de predição
-def predict_image(image_path):
-    """Faz predição em uma imagem"""
-    image = cv2.imread(image_path)
-    if image is None:
-        return None, None, None
-
-    processed = preprocess_image(image)
-    predictions = modelo.predict(processed, verbose=0)
-
-    class_index = np.argmax(predictions[0])
-    confidence = predictions[0][class_index]
-    class_name = labels[class_index] if class_index < len(labels) else "unknown"
-
-    return class_name, confidence, class_index
+# Função de pré-processamento (mesma do monitor_epi.py: o teste avalia o
+# modelo nas condições de produção)
+resize_buf = np.empty((IMG_SIZE, IMG_SIZE, 3), dtype=np.uint8)
+
+def preprocess_image(image, out):
+    """Pré-processa imagem para o modelo, escrevendo em out (IMG_SIZE, IMG_SIZE, 3)"""
+    # Redimensionar primeiro (INTER_AREA: filtro de caixa, sem aliasing na redução)
+    cv2.resize(image, (IMG_SIZE, IMG_SIZE), dst=resize_buf, interpolation=cv2.INTER_AREA)
+    # BGR para RGB via view invertida + normalizar para [0, 1]
+    np.multiply(resize_buf[..., ::-1], np.float32(1 / 255), out=out, dtype=np.float32)
+
+# Função de predição em lote
+def predict_batch(batch):
+    """Executa o modelo sobre um lote (N, IMG_SIZE, IMG_SIZE, 3)"""
+    global input_details, output_details
+
+    if input_details['shape'][0] != len(batch):
+        # Redimensionar o tensor de entrada para o tamanho do lote
+        interpreter.resize_tensor_input(input_details['index'], batch.shape)
+        interpreter.allocate_tensors()
+        input_details = interpreter.get_input_details()[0]
+        output_details = interpreter.get_output_details()[0]
+
+    interpreter.set_tensor(input_details['index'], batch)
+    interpreter.invoke()
+    return interpreter.get_tensor(output_details['index'])
+
+# Labels sem o número ("0 com_epi" -> "com_epi"); índice fora da lista -> "unknown"
+labels_clean = np.array(
+    [label.split()[-1] if ' ' in label else label for label in labels] + ["unknown"]
+)
+
+def evaluate_directory(test_dir, expected):
+    """
+    Classifica as primeiras 20 imagens .jpg do diretório em lotes
+
+    Returns:
+        tuple: (total de imagens, predições corretas)
+    """
+    image_files = [f for f in os.listdir(test_dir) if f.endswith('.jpg')][:20]
+    print(f"Processando {len(image_files)} imagens de {test_dir}...\n")
+
+    # Pré-processar todas as imagens legíveis em um único tensor
+    batch = np.empty((len(image_files), IMG_SIZE, IMG_SIZE, 3), dtype=np.float32)
+    loaded_files = []
+    for img_file in image_files:
+        image = cv2.imread(os.path.join(test_dir, img_file))
+        if image is None:
+            continue
+        preprocess_image(image, out=batch[len(loaded_files)])
+        loaded_files.append(img_file)
+
+    if not loaded_files:
+        return len(image_files), 0
+
+    batch = batch[:len(loaded_files)]
+    predictions = np.concatenate([
+        predict_batch(batch[start:start + BATCH_SIZE])
+        for start in range(0, len(batch), BATCH_SIZE)
+    ])
+
+    # Veredito vetorizado para todo o lote
+    class_indices = predictions.argmax(axis=1)
+    confidences = predictions[np.arange(len(predictions)), class_indices]
+    names = labels_clean[np.minimum(class_indices, len(labels))]
+    is_correct = np.char.find(np.char.lower(names), expected) >= 0
+
+    for img_file, label_clean, confidence, correct in zip(loaded_files, names, confidences, is_correct):
+        status = "✅" if correct else "❌"
+        print(f"{status} {img_file:15} -> {label_clean:15} (confiança: {confidence:.1%})")
+
+    return len(image_files), int(is_correct.sum())
 
 print("\n[3/3] Processando imagens de teste...")
 print()
@@ -80,28 +162,7 @@ print("TESTE 1: Imagens COM EPI (esperado: detecção de 'com_EPI')")
 print("=" * 70)
 
 if os.path.exists(TEST_DIR_COM_EPI):
-    images_com = [f for f in os.listdir(TEST_DIR_COM_EPI) if f.endswith('.jpg')][:20]
-    print(f"Processando {len(images_com)} imagens de {TEST_DIR_COM_EPI}...\n")
-
-    correct_com = 0
-    total_com = len(images_com)
-
-    for img_file in images_com:
-        img_path = os.path.join(TEST_DIR_COM_EPI, img_file)
-        class_name, confidence, class_idx = predict_image(img_path)
-
-        if class_name:
-            # Extrair apenas a parte relevante do label (remover número)
-            label_clean = class_name.split()[-1] if ' ' in class_name else class_name
-
-            # Verificar se a predição está correta
-            is_correct = 'com' in label_clean.lower()
-            status = "✅" if is_correct else "❌"
-
-            if is_correct:
-                correct_com += 1
-
-            print(f"{status} {img_file:15} -> {label_clean:15} (confiança: {confidence:.1%})")
+    total_com, correct_com = evaluate_directory(TEST_DIR_COM_EPI, 'com')
 
     accuracy_com = (correct_com / total_com * 100) if total_com > 0 else 0
     print(f"\n📊 Acurácia COM EPI: {correct_com}/{total_com} = {accuracy_com:.1f}%")
@@ -116,28 +177,7 @@ print("TESTE 2: Imagens SEM EPI (esperado: detecção de 'sem_EPI')")
 print("=" * 70)
 
 if os.path.exists(TEST_DIR_SEM_EPI):
-    images_sem = [f for f in os.listdir(TEST_DIR_SEM_EPI) if f.endswith('.jpg')][:20]
-    print(f"Processando {len(images_sem)} imagens de {TEST_DIR_SEM_EPI}...\n")
-
-    correct_sem = 0
-    total_sem = len(images_sem)
-
-    for img_file in images_sem:
-        img_path = os.path.join(TEST_DIR_SEM_EPI, img_file)
-        class_name, confidence, class_idx = predict_image(img_path)
-
-        if class_name:
-            # Extrair apenas a parte relevante do label
-            label_clean = class_name.split()[-1] if ' ' in class_name else class_name
-
-            # Verificar se a predição está correta
-            is_correct = 'sem' in label_clean.lower()
-            status = "✅" if is_correct else "❌"
-
-            if is_correct:
-                correct_sem += 1
-
-            print(f"{status} {img_file:15} -> {label_clean:15} (confiança: {confidence:.1%})")
+    total_sem, correct_sem = evaluate_directory(TEST_DIR_SEM_EPI, 'sem')
 
     accuracy_sem = (correct_sem / total_sem * 100) if total_sem > 0 else 0
     print(f"\n📊 Acurácia SEM EPI: {correct_sem}/{total_sem} = {accuracy_sem:.1f}%")
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Guardian EPI - Serviço Persistente do Controle de Uniformes
+Autor: Sistema Guardian EPI
+Data: 2025
+
+Mantém um único ControleUniforme carregado (modelo, warmup e log de
+violações) durante todo o turno e atende verificações por um socket UNIX
+local. Cada execução de `controle_uniforme.py --socket` vira um cliente
+leve, sem pagar a importação do TensorFlow, a carga do modelo e o warmup
+a cada entrada.
+
+PROTOCOLO (uma mensagem JSON por linha, em UTF-8):
+    -> {"op": "verify", "paths": ["/abs/img1.jpg", ...]}
+    <- {"ok": true, "results": [{"path": ..., "is_compliant": ...,
+                                 "class_name": ..., "confidence": ...}, ...]}
+
+    -> {"op": "report"}
+    <- {"ok": true, "violations": <total do serviço>}
+
+    -> {"op": "ping"}
+    <- {"ok": true, "backend": "onnx" | "tflite" | "keras" | null}
+
+    Em caso de erro: {"ok": false, "error": "<mensagem>"}
+
+As violações (imagem de evidência e linha de log) são registradas pelo
+serviço; o cliente apenas exibe o resultado. O socket é criado com
+permissão 0600: só o usuário que executa o serviço pode usá-lo.
+
+Uso:
+    python servico_uniforme.py [--socket /tmp/guardian_uniforme.sock]
+"""
+
+import os
+import sys
+import json
+import stat
+import socket
+import argparse
+import logging
+import threading
+import socketserver
+
+from controle_uniforme import (
+    ControleUniforme,
+    BATCH_SIZE,
+    SERVICE_SOCKET_PATH,
+)
+
+logger = logging.getLogger(__name__)
+
+
+# ==============================================================================
+# SERVIDOR
+# ==============================================================================
+
+class _UniformeRequestHandler(socketserver.StreamRequestHandler):
+    """
+    Atende uma conexão: lê requisições JSON por linha até o cliente fechar
+    """
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+
+            try:
+                request = json.loads(line)
+                response = self.server.dispatch(request)
+            except Exception as e:
+                logger.error(f"Erro ao atender requisição: {e}")
+                response = {"ok": False, "error": str(e)}
+
+            self.wfile.write(json.dumps(response).encode('utf-8') + b"\n")
+
+
+class UniformeServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Servidor de verificação de uniformes em socket UNIX
+
+    Aceita várias conexões simultâneas, mas as verificações são
+    serializadas: o modelo e os buffers do ControleUniforme não são
+    compartilháveis entre threads.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path=SERVICE_SOCKET_PATH, batch_size=BATCH_SIZE):
+        self._remove_stale_socket(socket_path)
+
+        self.socket_path = socket_path
+        self.batch_size = batch_size
+        self.controle = ControleUniforme()
+        self._lock = threading.Lock()
+
+        super().__init__(socket_path, _UniformeRequestHandler)
+
+    @staticmethod
+    def _remove_stale_socket(socket_path):
+        """
+        Remove o socket órfão de uma execução anterior
+
+        Recusa remover o caminho se não for um socket ou se outra instância
+        ainda estiver atendendo nele.
+        """
+        try:
+            mode = os.lstat(socket_path).st_mode
+        except FileNotFoundError:
+            return
+
+        if not stat.S_ISSOCK(mode):
+            raise RuntimeError(f"{socket_path} existe e não é um socket")
+
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(socket_path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            # Ninguém ouvindo: socket órfão
+            os.unlink(socket_path)
+            return
+        finally:
+            probe.close()
+
+        raise RuntimeError(f"Serviço já em execução em {socket_path}")
+
+    def server_bind(self):
+        # Socket acessível só ao usuário do serviço: as requisições leem
+        # caminhos arbitrários e gravam evidências de violação. A umask
+        # cobre a janela entre o bind e o chmod.
+        old_umask = os.umask(0o177)
+        try:
+            super().server_bind()
+        finally:
+            os.umask(old_umask)
+        os.chmod(self.socket_path, 0o600)
+
+    def dispatch(self, request):
+        """
+        Executa uma requisição do protocolo
+
+        Args:
+            request: Dicionário com a chave "op"
+
+        Returns:
+            Dicionário de resposta
+        """
+        op = request.get("op")
+
+        if op == "verify":
+            paths = request.get("paths", [])
+            with self._lock:
+                results = [
+                    {
+                        "path": image_path,
+                        "is_compliant": bool(is_compliant),
+                        "class_name": str(class_name),
+                        "confidence": float(confidence),
+                    }
+                    for image_path, is_compliant, class_name, confidence
+                    in self.controle.evaluate_paths(paths, self.batch_size)
+                ]
+            return {"ok": True, "results": results}
+
+        if op == "report":
+            with self._lock:
+                self.controle.generate_compliance_report()
+                violations = self.controle.violations_count
+            return {"ok": True, "violations": violations}
+
+        if op == "ping":
+            return {"ok": True, "backend": self.controle.backend}
+
+        raise ValueError(f"Operação desconhecida: {op}")
+
+    def server_close(self):
+        super().server_close()
+        self.controle.close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+# ==============================================================================
+# CLIENTE
+# ==============================================================================
+
+class UniformeClient:
+    """
+    Cliente do serviço persistente (não carrega o modelo)
+    """
+
+    def __init__(self, socket_path=SERVICE_SOCKET_PATH):
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.connect(socket_path)
+        self._file = self._sock.makefile('rwb')
+
+    def _request(self, request):
+        self._file.write(json.dumps(request).encode('utf-8') + b"\n")
+        self._file.flush()
+
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("Serviço encerrou a conexão")
+
+        response = json.loads(line)
+        if not response.get("ok"):
+            raise RuntimeError(f"Erro no serviço: {response.get('error')}")
+        return response
+
+    def verify(self, image_paths):
+        """
+        Verifica imagens no serviço
+
+        Args:
+            image_paths: Lista de caminhos (enviados como absolutos, já que
+                o diretório de trabalho do serviço pode ser outro)
+
+        Returns:
+            Lista de tuplas (caminho, is_compliant, class_name, confidence)
+        """
+        paths = [os.path.abspath(p) for p in image_paths]
+        response = self._request({"op": "verify", "paths": paths})
+        return [
+            (r["path"], r["is_compliant"], r["class_name"], r["confidence"])
+            for r in response["results"]
+        ]
+
+    def report(self):
+        """
+        Gera o relatório de conformidade com as violações do serviço
+
+        Returns:
+            Total de violações registradas pelo serviço
+        """
+        return self._request({"op": "report"})["violations"]
+
+    def close(self):
+        self._file.close()
+        self._sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ==============================================================================
+# FUNÇÃO PRINCIPAL
+# ==============================================================================
+
+def main():
+    """
+    Função principal - inicia o serviço até Ctrl+C
+    """
+    parser = argparse.ArgumentParser(
+        description="Serviço persistente do Controle de Uniformes"
+    )
+    parser.add_argument('--socket', default=SERVICE_SOCKET_PATH,
+                        help="Caminho do socket UNIX")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                        help="Número de imagens por inferência")
+    args = parser.parse_args()
+
+    try:
+        server = UniformeServer(args.socket, args.batch_size)
+    except Exception as e:
+        logger.error(f"Erro ao iniciar serviço: {e}")
+        print(f"\n❌ Erro: {e}")
+        return 1
+
+    logger.info(f"Serviço de uniformes ouvindo em {args.socket} (backend: {server.controle.backend})")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n⚠ Serviço interrompido pelo usuário")
+    finally:
+        server.server_close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())